@@ -2,15 +2,24 @@ from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 from typing import Optional, Dict, Any
+import hashlib
 import httpx
 import json
+import time
 from functools import lru_cache
+from ..cache import TTLCache
 from ..config import get_settings
+from .jwks import ASYMMETRIC_ALGORITHMS, jwks_cache
 from ..db.supabase_client import get_supabase_client
 
 settings = get_settings()
 security = HTTPBearer()
 
+# Payloads of tokens that passed verification, keyed by the token's SHA-256
+# so raw tokens are never held; each entry expires with its token's exp
+verified_tokens = TTLCache(maxsize=settings.JWT_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+@lru_cache()
 def get_supabase_jwt_secret() -> str:
     """Get the JWT secret from Supabase for token verification."""
     # For production, use the JWT secret from your Supabase dashboard
@@ -26,17 +35,40 @@ def get_supabase_jwt_secret() -> str:
         )
     return jwt_secret
 
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def cached_token_payload(token: str) -> Optional[Dict[str, Any]]:
+    """Payload of a token that already passed verification, without verifying it"""
+    return verified_tokens.get(_token_digest(token))
+
 async def verify_jwt_token(token: str) -> Optional[Dict[str, Any]]:
     """Verify JWT token and return payload."""
+    # Dashboards send the same token on every poll; skip re-verifying it
+    token_digest = _token_digest(token)
+    payload = verified_tokens.get(token_digest)
+    if payload is not None:
+        return payload
+    
     try:
-        # Get the JWT secret for verification
-        jwt_secret = get_supabase_jwt_secret()
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm in ASYMMETRIC_ALGORITHMS:
+            # Asymmetric keys come from the JWKS cache, never from the network
+            signing_key = jwks_cache.get(header.get("kid"))
+            if signing_key is None or signing_key.algorithm_name != algorithm:
+                raise jwt.InvalidTokenError("Unknown signing key")
+            key = signing_key.key
+        else:
+            # Get the JWT secret for verification
+            algorithm = "HS256"
+            key = get_supabase_jwt_secret()
         
-        # Verify the token with the secret
+        # Verify the token with the key
         payload = jwt.decode(
             token,
-            jwt_secret,
-            algorithms=["HS256"],
+            key,
+            algorithms=[algorithm],
             audience="authenticated",
             options={
                 "verify_signature": True,
@@ -48,6 +80,10 @@ async def verify_jwt_token(token: str) -> Optional[Dict[str, Any]]:
         # Additional validation for Supabase tokens
         if not payload.get("sub"):
             raise jwt.InvalidTokenError("Missing subject in token")
+        
+        # Tokens without exp never expire, so they are not cached
+        if "exp" in payload:
+            verified_tokens.set(token_digest, payload, ttl=payload["exp"] - time.time())
             
         return payload
     except jwt.ExpiredSignatureError:
@@ -0,0 +1,127 @@
+import asyncio
+import re
+import time
+from typing import Dict, Optional
+
+import httpx
+import jwt
+
+from ..config import get_settings
+
+settings = get_settings()
+
+# Asymmetric algorithms accepted for access tokens
+ASYMMETRIC_ALGORITHMS = frozenset({"ES256", "RS256"})
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class JWKSCache:
+    """
+    In-process cache of the signing keys published at a JWKS endpoint.
+    Keys are fetched at startup and refreshed by a background task shortly
+    before they go stale, so verifying a token never waits on the network.
+    A token signed with an unknown kid (e.g. right after key rotation)
+    schedules one early refresh and is rejected meanwhile.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        refresh_interval: float = 600.0,
+        min_refresh_interval: float = 30.0,
+        timeout: float = 5.0
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._last_fetch = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+        self._refresh: Optional[asyncio.Task] = None
+
+    def get(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        """Look up a signing key, scheduling a refresh when the kid is unknown"""
+        key = self._keys.get(kid)
+        if key is None:
+            self.request_refresh()
+        return key
+
+    def request_refresh(self):
+        """Refresh in the background, at most once per `min_refresh_interval`"""
+        if not self.url or (self._refresh and not self._refresh.done()):
+            return
+        if time.monotonic() - self._last_fetch < self.min_refresh_interval:
+            return
+        self._refresh = asyncio.create_task(self.refresh())
+
+    async def refresh(self) -> bool:
+        """Fetch the key set; the previous keys stay in use if this fails"""
+        self._last_fetch = time.monotonic()
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+            data = response.json()
+            # Projects still signing with a shared secret publish no keys
+            keys = jwt.PyJWKSet.from_dict(data).keys if data.get("keys") else []
+        except Exception as e:
+            print(f"Error fetching JWKS from {self.url}: {type(e).__name__}: {str(e)}")
+            return False
+
+        self._keys = {
+            key.key_id: key
+            for key in keys
+            if key.key_id and key.algorithm_name in ASYMMETRIC_ALGORITHMS
+            and key.public_key_use in (None, "sig")
+        }
+        match = MAX_AGE_PATTERN.search(response.headers.get("cache-control", ""))
+        max_age = min(int(match.group(1)), self.refresh_interval) if match else self.refresh_interval
+        self._expires_at = time.monotonic() + max_age
+        return True
+
+    async def start(self):
+        """Load the keys and keep them fresh until stop()"""
+        if not self.url or self._task:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop(), name="jwks-refresh")
+
+    async def stop(self):
+        for task in (self._task, self._refresh):
+            if task:
+                task.cancel()
+        await asyncio.gather(*(t for t in (self._task, self._refresh) if t), return_exceptions=True)
+        self._task = self._refresh = None
+
+    async def _refresh_loop(self):
+        retry_delay = 1.0
+        while True:
+            remaining = self._expires_at - time.monotonic()
+            if remaining > 0:
+                # Refresh at 80% of the key set's lifetime
+                await asyncio.sleep(remaining * 0.8)
+            else:
+                # The last fetch failed; back off
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.refresh_interval)
+            if await self.refresh():
+                retry_delay = 1.0
+
+
+def _jwks_url() -> Optional[str]:
+    if settings.JWT_JWKS_URL:
+        return settings.JWT_JWKS_URL
+    if settings.SUPABASE_URL:
+        return f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+    return None
+
+
+# Initialize a singleton instance
+jwks_cache = JWKSCache(
+    _jwks_url(),
+    refresh_interval=settings.JWT_JWKS_REFRESH_SECONDS,
+    min_refresh_interval=settings.JWT_JWKS_MIN_REFRESH_SECONDS
+)
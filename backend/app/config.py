@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 import os
-from typing import List
+from typing import Any, Dict, List
 from dotenv import load_dotenv
 
 # Load .env file
@@ -24,6 +24,63 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "your-jwt-secret-key"  # MUST be updated from Supabase Dashboard
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    JWT_CACHE_SIZE: int = 4096
+    # Signing keys for ES256/RS256 tokens; defaults to the Supabase project JWKS
+    JWT_JWKS_URL: str = ""
+    JWT_JWKS_REFRESH_SECONDS: int = 600
+    JWT_JWKS_MIN_REFRESH_SECONDS: int = 30
+    
+    # GitHub API Configuration
+    GITHUB_API_URL: str = "https://api.github.com"
+    GITHUB_MAX_CONNECTIONS: int = 20
+    GITHUB_MAX_CONCURRENT_REQUESTS: int = 10
+    GITHUB_MAX_RETRIES: int = 3
+    GITHUB_MAX_RATE_LIMIT_WAIT: float = 60.0
+    GITHUB_RETRY_BASE_DELAY: float = 0.5
+    GITHUB_TOKEN_CONCURRENCY: int = 3
+    GITHUB_IDENTITY_CACHE_TTL: int = 300
+    GITHUB_IDENTITY_CACHE_SIZE: int = 1024
+    GITHUB_REPO_LIST_CACHE_TTL: int = 3600
+    
+    # Background Jobs
+    JOB_CONCURRENCY: int = 4
+    JOB_RETENTION_SECONDS: int = 3600
+    PROVISION_CHECKPOINT_TTL: int = 86400
+    
+    # Idempotency-Key handling
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    
+    # Rate Limiting
+    RATE_LIMIT_MAX_CLIENTS: int = 100000
+    # Share limits across workers and replicas, e.g. redis://localhost:6379/0
+    RATE_LIMIT_REDIS_URL: str = ""
+    RATE_LIMIT_REDIS_TIMEOUT: float = 0.25
+    # Per-client budgets, keyed on the JWT subject or else the client IP
+    RATE_LIMIT_BUCKETS: Dict[str, Dict[str, float]] = {
+        "default": {"limit": 100, "period": 60},
+        "auth": {"limit": 20, "period": 60},
+    }
+    # First match wins; unmatched requests cost 1 from "default". Paths use
+    # {param} for one segment and a trailing /** for everything below. Bulk
+    # rules add cost_per_item for each entry of the "items" body list.
+    RATE_LIMIT_RULES: List[Dict[str, Any]] = [
+        {"path": "/health", "cost": 0},
+        {"path": "/api/v1/auth/**", "bucket": "auth"},
+        {"methods": ["POST"], "path": "/api/v1/github/repositories", "cost": 10},
+        {"methods": ["POST"], "path": "/api/v1/github/repositories/bulk", "items": "repositories", "cost_per_item": 10},
+        {"methods": ["POST"], "path": "/api/v1/github/repositories/upgrade", "items": "repositories", "cost_per_item": 5},
+        {"methods": ["POST"], "path": "/api/v1/github/repositories/bulk-delete", "items": "repositories", "cost_per_item": 3},
+        {"methods": ["POST"], "path": "/api/v1/github/repositories/{owner}/{repo}/upgrade", "cost": 5},
+        {"methods": ["DELETE"], "path": "/api/v1/github/repositories/{owner}/{repo}", "cost": 3},
+        {"path": "/api/v1/templates/export", "cost": 5},
+    ]
+    
+    # Project Templates
+    TEMPLATE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    TEMPLATE_COMPOSITION_CACHE_SIZE: int = 32
+    TEMPLATE_RENDER_CACHE_SIZE: int = 4096
+    TEMPLATE_UPGRADE_CONCURRENCY: int = 4
     
     # CORS Configuration - Simple string that we'll parse
     CORS_ORIGINS: str = "http://localhost:3000"
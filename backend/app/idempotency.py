@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import inspect
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from .cache import TTLCache
+from .config import get_settings
+
+settings = get_settings()
+
+
+class IdempotencyStore:
+    """
+    Deduplicates retried requests carrying an Idempotency-Key header.
+    A duplicate that arrives while the first request is still running waits
+    for it and gets the same result; one that arrives later gets the stored
+    result for `ttl` seconds. Failures are not stored, so a retry after an
+    error runs again. Keys are scoped per user, method and path, and reusing
+    a key with a different body is rejected.
+    """
+
+    def __init__(self, ttl: float = 86400, maxsize: int = 10000):
+        self._completed = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: Dict[Hashable, Tuple[str, asyncio.Future]] = {}
+        self.executed = 0
+        self.replayed = 0
+        self.joined = 0
+
+    async def run(
+        self,
+        request: Request,
+        user_id: str,
+        func: Callable[[], Any],
+        reusable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Run `func` (sync or async) once per Idempotency-Key, or on every call
+        without one.
+        `reusable` can reject a stored result, e.g. a job that has since failed,
+        so the request runs again.
+        """
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return await self._call(func)
+
+        scope = (user_id, request.method, request.url.path, key)
+        fingerprint = hashlib.sha256(await request.body()).hexdigest()
+
+        stored = self._completed.get(scope)
+        if stored is not None:
+            self._check_fingerprint(stored[0], fingerprint)
+            if reusable is None or reusable(stored[1]):
+                self.replayed += 1
+                return stored[1]
+            self._completed.pop(scope)
+
+        pending = self._in_flight.get(scope)
+        if pending is not None:
+            self._check_fingerprint(pending[0], fingerprint)
+            self.joined += 1
+            # Don't let a disconnecting duplicate cancel the original
+            return await asyncio.shield(pending[1])
+
+        future = asyncio.get_running_loop().create_future()
+        # Duplicates see the error themselves; don't warn when there are none
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[scope] = (fingerprint, future)
+        self.executed += 1
+        try:
+            result = await self._call(func)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._in_flight[scope]
+
+        self._completed.set(scope, (fingerprint, result))
+        future.set_result(result)
+        return result
+
+    async def _call(self, func: Callable[[], Any]) -> Any:
+        result = func()
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _check_fingerprint(self, stored: str, fingerprint: str):
+        if stored != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="This Idempotency-Key was already used with a different request."
+            )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "stored": len(self._completed),
+            "in_flight": len(self._in_flight),
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "joined": self.joined,
+            "duplicates_absorbed": self.replayed + self.joined
+        }
+
+
+# Initialize a singleton instance
+idempotency_store = IdempotencyStore(
+    ttl=settings.IDEMPOTENCY_TTL,
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE
+)
@@ -6,10 +6,15 @@ import logging
 import uuid
 
 from .config import get_settings
-from .routers import auth, users, github, projects
+from .auth.jwks import jwks_cache
+from .routers import auth, users, github, projects, jobs, templates
 from .db.supabase_client import get_supabase_client
 from .middleware import SecurityHeadersMiddleware, RateLimitMiddleware
+from .rate_limit import rate_limit_backend, rate_limit_rules
 from .websocket_manager import manager
+from .services.github_client import github_client
+from .services.job_queue import job_queue
+from .services.template_registry import template_registry
 
 # Load environment variables
 load_dotenv()
@@ -26,7 +31,11 @@ app = FastAPI(
 
 # Add security middleware
 app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(RateLimitMiddleware, calls=100, period=60)
+app.add_middleware(
+    RateLimitMiddleware,
+    backend=rate_limit_backend,
+    rules=rate_limit_rules
+)
 
 # Add trusted host middleware (prevents host header attacks)
 if settings.ENVIRONMENT == "production":
@@ -42,8 +51,8 @@ app.add_middleware(
     allow_origins=settings.get_cors_origins(),  # Specific origins only
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Specific methods
-    allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Requested-With", "X-GitHub-Token"],  # Specific headers
-    expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"],
+    allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Requested-With", "X-GitHub-Token", "If-None-Match", "Idempotency-Key"],  # Specific headers
+    expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "ETag", "X-Next-Cursor", "Content-Disposition", "X-Template-Version"],
     max_age=86400,  # Cache preflight requests for 24 hours
 )
 
@@ -52,10 +61,27 @@ app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["aut
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 app.include_router(github.router, tags=["github"])
 app.include_router(projects.router, tags=["projects"])
+app.include_router(jobs.router, tags=["jobs"])
+app.include_router(templates.router, tags=["templates"])
 
 # Set up logging
 logger = logging.getLogger("uvicorn")
 
+@app.on_event("startup")
+async def startup():
+    """Load the default project template and JWT signing keys, and start the background job workers"""
+    await template_registry.load(template_registry.default_name)
+    await jwks_cache.start()
+    job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background workers and release shared outbound connections"""
+    await job_queue.stop()
+    await jwks_cache.stop()
+    await rate_limit_backend.close()
+    await github_client.close()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
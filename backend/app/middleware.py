@@ -1,11 +1,15 @@
 from fastapi import Request, Response
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable
+from typing import Callable, Optional
+import json
+import math
 import time
-import asyncio
-from collections import defaultdict
-from datetime import datetime, timedelta
+
+from .auth.auth import cached_token_payload
+from .rate_limit import (
+    MemoryRateLimitBackend, RateLimitBackend, RateLimitBucket, RateLimitRule, RateLimitRules, rate_limit_rules
+)
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """Add security headers to all responses."""
@@ -46,76 +50,75 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Rate limiting middleware to prevent abuse."""
     
-    def __init__(self, app, calls: int = 100, period: int = 60):
+    def __init__(
+        self,
+        app,
+        backend: Optional[RateLimitBackend] = None,
+        rules: Optional[RateLimitRules] = None
+    ):
         super().__init__(app)
-        self.calls = calls
-        self.period = timedelta(seconds=period)
-        self.clients = defaultdict(list)
-        self.cleanup_interval = 300  # Clean up old entries every 5 minutes
-        self.last_cleanup = time.time()
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        self.rules = rules or rate_limit_rules
         
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Get client identifier (IP address)
-        client_id = request.client.host if request.client else "unknown"
-        
-        # Special rate limits for auth endpoints
-        if request.url.path.startswith("/api/v1/auth"):
-            # Stricter limits for auth endpoints
-            calls_limit = 20  # 20 attempts per minute
-            period = timedelta(seconds=60)
-        else:
-            calls_limit = self.calls
-            period = self.period
-        
-        now = datetime.now()
-        
-        # Clean up old entries periodically
-        if time.time() - self.last_cleanup > self.cleanup_interval:
-            self._cleanup_old_entries()
-            self.last_cleanup = time.time()
-        
-        # Get the client's request history
-        requests = self.clients[client_id]
-        
-        # Remove old requests outside the time window
-        requests[:] = [req_time for req_time in requests if req_time > now - period]
+        rule = self.rules.match(request.method, request.url.path)
+        if not rule.cost and not rule.cost_per_item:
+            return await call_next(request)
+        
+        bucket = self.rules.buckets[rule.bucket]
+        client_id = self._client_id(request)
+        result = await self.backend.acquire(
+            f"{rule.bucket}:{client_id}",
+            bucket.limit,
+            bucket.period,
+            await self._cost(request, rule, bucket)
+        )
+        reset = str(math.ceil(time.time() + result.reset_after))
         
         # Check if rate limit exceeded
-        if len(requests) >= calls_limit:
+        if not result.allowed:
             response = Response(
                 content="Rate limit exceeded. Please try again later.",
                 status_code=429,
                 headers={
-                    "Retry-After": str(period.seconds),
-                    "X-RateLimit-Limit": str(calls_limit),
+                    "Retry-After": str(math.ceil(result.retry_after)),
+                    "X-RateLimit-Limit": str(result.limit),
                     "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int((now + period).timestamp()))
+                    "X-RateLimit-Reset": reset
                 }
             )
             return response
         
-        # Record this request
-        requests.append(now)
-        
         # Process the request
         response = await call_next(request)
         
         # Add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(calls_limit)
-        response.headers["X-RateLimit-Remaining"] = str(calls_limit - len(requests))
-        response.headers["X-RateLimit-Reset"] = str(int((now + period).timestamp()))
+        response.headers["X-RateLimit-Limit"] = str(result.limit)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+        response.headers["X-RateLimit-Reset"] = reset
         
         return response
     
-    def _cleanup_old_entries(self):
-        """Remove old entries to prevent memory bloat."""
-        now = datetime.now()
-        for client_id in list(self.clients.keys()):
-            # Remove entries older than 1 hour
-            self.clients[client_id] = [
-                req_time for req_time in self.clients[client_id]
-                if req_time > now - timedelta(hours=1)
-            ]
-            # Remove client if no recent requests
-            if not self.clients[client_id]:
-                del self.clients[client_id]
\ No newline at end of file
+    def _client_id(self, request: Request) -> str:
+        """The verified JWT subject, so users behind one NAT get their own budget, or else the client IP"""
+        authorization = request.headers.get("Authorization", "")
+        if authorization.startswith("Bearer "):
+            # Only tokens an endpoint has already verified; a token's first
+            # request, and any invalid one, is counted against its IP
+            payload = cached_token_payload(authorization[7:])
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}"
+        
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+    
+    async def _cost(self, request: Request, rule: RateLimitRule, bucket: RateLimitBucket) -> float:
+        """The rule's cost plus its per-item cost for each entry in a bulk request body"""
+        if not rule.items:
+            return rule.cost
+        try:
+            # Starlette keeps the body, so the endpoint still receives it
+            items = json.loads(await request.body()).get(rule.items)
+        except (ValueError, AttributeError):
+            items = None
+        count = len(items) if isinstance(items, list) else 0
+        return min(rule.cost + rule.cost_per_item * count, bucket.limit)
@@ -1,3 +1,4 @@
 # Models module
 from .user import User
-from .project import ProjectBase, ProjectCreate, ProjectUpdate, ProjectResponse, ProjectListResponse
\ No newline at end of file
+from .project import ProjectBase, ProjectCreate, ProjectUpdate, ProjectResponse, ProjectListResponse
+from .job import Job, JobStatus
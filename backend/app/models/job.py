@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional, Any, Dict
+from datetime import datetime
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    user_id: str
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Any] = None
+    error: Optional[Dict[str, Any]] = None
@@ -0,0 +1,253 @@
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from pydantic import BaseModel, Field
+
+from .config import get_settings
+
+try:
+    from redis import asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # Optional; only needed when RATE_LIMIT_REDIS_URL is set
+    aioredis = None
+    RedisError = Exception
+
+settings = get_settings()
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the request would be allowed (0 when it was)
+    retry_after: float
+    # Seconds until the bucket is full again
+    reset_after: float
+
+
+def _result(allowed: bool, capacity: int, rate: float, tokens: float, cost: float) -> RateLimitResult:
+    return RateLimitResult(
+        allowed,
+        capacity,
+        int(tokens),
+        0.0 if allowed else (cost - tokens) / rate,
+        (capacity - tokens) / rate
+    )
+
+
+class RateLimitBackend(ABC):
+    """
+    Where the token buckets live. Each bucket holds up to `capacity` tokens
+    and refills continuously at `capacity / period` per second; a request
+    takes `cost` tokens, or is refused without taking any.
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, capacity: int, period: float, cost: float = 1.0) -> RateLimitResult:
+        ...
+
+    async def close(self):
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in this process: a check is O(1) and a client costs two floats.
+    The table is an LRU bounded by `max_clients`. An evicted client comes
+    back with a full bucket, the same as one idle for a whole period.
+    Limits apply per worker process.
+    """
+
+    def __init__(self, max_clients: int = 100000):
+        self.max_clients = max_clients
+        # key -> [tokens, monotonic time of last update]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def acquire(self, key: str, capacity: int, period: float, cost: float = 1.0) -> RateLimitResult:
+        return self.acquire_nowait(key, capacity, period, cost)
+
+    def acquire_nowait(self, key: str, capacity: int, period: float, cost: float = 1.0) -> RateLimitResult:
+        rate = capacity / period
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(capacity), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        allowed = bucket[0] >= cost
+        if allowed:
+            bucket[0] -= cost
+        return _result(allowed, capacity, rate, bucket[0], cost)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Refill, take and store in one step on the server, timed by the server's
+# clock so replicas with skewed clocks agree. A bucket expires once it
+# would be full again, so idle clients cost nothing.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+if tokens == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + math.max(0, now - tonumber(bucket[2])) * rate)
+end
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Buckets shared by every worker and replica through Redis. Each check is
+    a single EVALSHA round trip. While Redis is unreachable, checks fall
+    back to per-process buckets rather than failing requests, and Redis is
+    retried after `retry_interval` seconds instead of on every request.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "ratelimit:",
+        timeout: float = 0.25,
+        retry_interval: float = 5.0,
+        fallback: Optional[MemoryRateLimitBackend] = None
+    ):
+        if aioredis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed")
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self._fallback = fallback if fallback is not None else MemoryRateLimitBackend()
+        self.retry_interval = retry_interval
+        self._available = True
+        self._retry_at = 0.0
+
+    async def acquire(self, key: str, capacity: int, period: float, cost: float = 1.0) -> RateLimitResult:
+        rate = capacity / period
+        if not self._available and time.monotonic() < self._retry_at:
+            return self._fallback.acquire_nowait(key, capacity, period, cost)
+        try:
+            allowed, tokens = await self._script(keys=[self.prefix + key], args=[capacity, rate, cost])
+        except (RedisError, OSError) as e:
+            if self._available:
+                print(f"Rate limit store unavailable, limiting per process: {type(e).__name__}: {str(e)}")
+                self._available = False
+            self._retry_at = time.monotonic() + self.retry_interval
+            return self._fallback.acquire_nowait(key, capacity, period, cost)
+
+        if not self._available:
+            print("Rate limit store available again")
+            self._available = True
+        return _result(bool(allowed), capacity, rate, float(tokens), cost)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+class RateLimitBucket(BaseModel):
+    limit: int = Field(..., gt=0)
+    period: float = Field(..., gt=0)
+
+
+class RateLimitRule(BaseModel):
+    path: str
+    methods: List[str] = ["*"]
+    # Tokens a matching request takes; 0 exempts it from limiting
+    cost: float = Field(1, ge=0)
+    # Extra tokens per entry of the list in this JSON body field, for bulk
+    # endpoints; the total is capped at what the bucket holds
+    items: Optional[str] = None
+    cost_per_item: float = Field(0, ge=0)
+    bucket: str = "default"
+
+
+def _path_regex(path: str) -> str:
+    """Translate a rule path such as /repositories/{owner}/** into a regex"""
+    subtree = path.endswith("/**")
+    if subtree:
+        path = path[:-3]
+    pattern = "".join(
+        "[^/]+" if part.startswith("{") else re.escape(part)
+        for part in re.split(r"(\{[^/}]*\})", path)
+        if part
+    )
+    return pattern + "(?:/.*)?" if subtree else pattern
+
+
+class RateLimitRules:
+    """
+    Rate limit rules compiled into one regex per HTTP method, so matching a
+    request is a single scan however many rules there are. Each rule is a
+    named alternative in declaration order, and the first that matches wins.
+    """
+
+    def __init__(self, rules: Iterable[Dict[str, Any]], buckets: Dict[str, Dict[str, float]]):
+        self.buckets = {name: RateLimitBucket(**bucket) for name, bucket in buckets.items()}
+        self.rules = [RateLimitRule(**rule) for rule in rules]
+        self.fallback = RateLimitRule(path="/**")
+
+        for rule in self.rules + [self.fallback]:
+            bucket = self.buckets.get(rule.bucket)
+            if bucket is None:
+                raise ValueError(f"Rate limit rule for {rule.path} uses unknown bucket: {rule.bucket}")
+            if rule.cost > bucket.limit:
+                raise ValueError(f"Rate limit rule for {rule.path} costs more than its bucket holds")
+
+        methods = {m.upper() for rule in self.rules for m in rule.methods} - {"*"}
+        self._tables = {method: self._compile(method) for method in methods}
+        self._any_method = self._compile("*")
+
+    def _compile(self, method: str) -> "re.Pattern":
+        return re.compile("|".join(
+            f"(?P<r{index}>{_path_regex(rule.path)})"
+            for index, rule in enumerate(self.rules)
+            if "*" in rule.methods or method in (m.upper() for m in rule.methods)
+        ) or "(?!)")
+
+    def match(self, method: str, path: str) -> RateLimitRule:
+        match = self._tables.get(method, self._any_method).fullmatch(path)
+        if match is None:
+            return self.fallback
+        return self.rules[int(match.lastgroup[1:])]
+
+
+def _create_backend() -> RateLimitBackend:
+    fallback = MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_CLIENTS)
+    if settings.RATE_LIMIT_REDIS_URL:
+        return RedisRateLimitBackend(
+            settings.RATE_LIMIT_REDIS_URL,
+            timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+            fallback=fallback
+        )
+    return fallback
+
+
+# Initialize singleton instances
+rate_limit_backend = _create_backend()
+rate_limit_rules = RateLimitRules(settings.RATE_LIMIT_RULES, settings.RATE_LIMIT_BUCKETS)
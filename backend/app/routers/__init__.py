@@ -1,2 +1,2 @@
 # Routers module
-from . import auth, users, github, projects
\ No newline at end of file
+from . import auth, users, github, projects, jobs, templates
\ No newline at end of file
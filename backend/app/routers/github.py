@@ -1,18 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from github import Github, GithubException, InputGitTreeElement
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel
-import base64
-import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import Dict, List, Optional, Tuple, Any
+from pydantic import BaseModel, Field
+from functools import partial
+from contextlib import asynccontextmanager
 import asyncio
+import base64
+import hashlib
+import json
 from datetime import datetime
 
 from ..auth.auth import get_current_user
-from ..services.template_service import template_service
+from ..cache import TTLCache
+from ..config import get_settings
+from ..idempotency import idempotency_store
+from ..models.job import Job, JobStatus
+from ..services.github_client import github_client, GitHubAPIError, GitHubSession, token_key
+from ..services.job_queue import job_queue
+from ..services.template_push import Notify, push_files
+from ..services.template_registry import template_registry
+from ..services.template_upgrade import UPGRADE_MODES, manifest_file, upgrade_repository
 from ..websocket_manager import manager
 from ..db.supabase_client import supabase_client
 
 router = APIRouter(prefix="/api/v1/github", tags=["github"])
+settings = get_settings()
+
+# Repository listing pages per token and query:
+# (GitHub ETag, response body, our ETag, next cursor).
+# Entries are revalidated with If-None-Match on every request.
+repo_list_cache = TTLCache(maxsize=1024, ttl=settings.GITHUB_REPO_LIST_CACHE_TTL)
+repo_list_stats = {"hits": 0, "misses": 0}
+
+# Provisioning progress per (user id, Idempotency-Key)
+provision_checkpoints = TTLCache(maxsize=1024, ttl=settings.PROVISION_CHECKPOINT_TTL)
+
+# Semaphore per token_key bounding how many repositories one GitHub account
+# provisions at once, across single and bulk requests, with the number of
+# holders and waiters; the entry is dropped when the last one releases it
+provision_slots: Dict[str, List[Any]] = {}
+
 
 
 class CreateRepositoryRequest(BaseModel):
@@ -24,6 +50,27 @@ class CreateRepositoryRequest(BaseModel):
     integrations: Optional[Dict[str, Any]] = None
 
 
+class BulkCreateRepositoryRequest(BaseModel):
+    repositories: List[CreateRepositoryRequest] = Field(..., min_length=1, max_length=50)
+
+
+class UpgradeRequest(BaseModel):
+    mode: str = "commit"
+
+
+class BulkUpgradeRequest(BaseModel):
+    repositories: List[str] = Field(..., min_length=1, max_length=50)
+    mode: str = "commit"
+
+
+class BulkDeleteRequest(BaseModel):
+    # owner/name of each repository
+    repositories: List[str] = Field(..., min_length=1, max_length=100)
+    # "delete" removes repositories and projects; "archive" archives the
+    # repositories and deactivates the projects
+    mode: str = "delete"
+
+
 class RepositoryResponse(BaseModel):
     id: int
     name: str
@@ -41,6 +88,17 @@ async def github_health_check() -> Dict[str, str]:
     return {"status": "ok", "service": "github"}
 
 
+@router.get("/metrics")
+async def github_metrics() -> Dict[str, Any]:
+    """Cache statistics for the GitHub integration"""
+    return {
+        "repository_list_cache": {"size": len(repo_list_cache), **repo_list_stats},
+        "identity_cache": github_client.identities.stats(),
+        "templates": template_registry.stats(),
+        "idempotency": idempotency_store.stats()
+    }
+
+
 @router.get("/test-access")
 async def test_github_access(
     request: Request,
@@ -57,40 +115,24 @@ async def test_github_access(
         )
     
     try:
-        # Initialize GitHub client with the token
-        g = Github(auth_header)
-        
-        # Test the token by getting the authenticated user
-        github_user = g.get_user()
-        
-        # Force the API call to happen by accessing a property
-        login = github_user.login
-        
-        # Check OAuth scopes by making a direct API call
-        import requests
-        scope_response = requests.get(
-            "https://api.github.com/user",
-            headers={
-                "Authorization": f"Bearer {auth_header}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-        )
-        
-        oauth_scopes = scope_response.headers.get("x-oauth-scopes", "")
+        # Test the token by getting the authenticated user; the same
+        # response carries the token's OAuth scopes
+        gh = github_client.session(auth_header)
+        github_user, oauth_scopes = await gh.get_user()
         
         return {
             "authenticated": True,
-            "github_username": login,
-            "github_id": github_user.id,
-            "name": github_user.name,
-            "email": github_user.email,
-            "public_repos": github_user.public_repos,
-            "private_repos": github_user.owned_private_repos,
+            "github_username": github_user["login"],
+            "github_id": github_user["id"],
+            "name": github_user.get("name"),
+            "email": github_user.get("email"),
+            "public_repos": github_user.get("public_repos"),
+            "private_repos": github_user.get("owned_private_repos"),
             "can_create_repos": True,
             "oauth_scopes": oauth_scopes,
             "has_repo_scope": "repo" in oauth_scopes
         }
-    except GithubException as e:
+    except GitHubAPIError as e:
         # More specific error handling for GitHub API errors
         if e.status == 401:
             raise HTTPException(
@@ -114,13 +156,16 @@ async def test_github_access(
         )
 
 
-@router.post("/repositories", response_model=RepositoryResponse)
+@router.post("/repositories", response_model=Job, status_code=202)
 async def create_repository(
     request: Request,
     repo_data: CreateRepositoryRequest,
     current_user: Dict = Depends(get_current_user)
-) -> RepositoryResponse:
-    """Create a new GitHub repository with a full Next.js + Supabase template"""
+) -> Job:
+    """
+    Queue creation of a new GitHub repository with a full Next.js + Supabase template.
+    Returns the background job at once; poll /api/v1/jobs/{id} for the result.
+    """
     auth_header = request.headers.get("X-GitHub-Token")
     if not auth_header:
         raise HTTPException(
@@ -128,35 +173,234 @@ async def create_repository(
             detail="GitHub token not found. Please authenticate with GitHub first."
         )
     
+    # Fail fast on stacks we have no template for
     try:
-        g = Github(auth_header)
-        github_user = g.get_user()
-        
-        # Create the repository WITHOUT auto_init to avoid conflicts
-        repo = github_user.create_repo(
-            name=repo_data.name,
-            description=repo_data.description or f"A new SaaS project created with 5AM Founder",
-            private=repo_data.private,
-            auto_init=False  # We'll create all files manually
+        template_name = template_registry.select(repo_data.tech_stack)
+    except LookupError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    layers = template_registry.layers_for(repo_data.tech_stack, repo_data.integrations)
+    
+    user_id = current_user.get("id", "unknown")
+    
+    # Requests with the same Idempotency-Key share provisioning progress, so
+    # a retry resumes where the last attempt stopped
+    checkpoint = None
+    idempotency_key = request.headers.get("Idempotency-Key")
+    if idempotency_key:
+        checkpoint = provision_checkpoints.get((user_id, idempotency_key))
+        if checkpoint is None:
+            checkpoint = {"name": repo_data.name}
+            provision_checkpoints.set((user_id, idempotency_key), checkpoint)
+        elif checkpoint["name"] != repo_data.name:
+            raise HTTPException(
+                status_code=422,
+                detail="This Idempotency-Key was already used for a different repository."
+            )
+    
+    async def run(job: Job) -> Dict[str, Any]:
+        notify = partial(manager.send_project_update, user_id, job_id=job.id)
+        try:
+            async with _provision_slot(auth_header):
+                repository = await _provision_repository(
+                    github_client.session(auth_header),
+                    repo_data,
+                    template_name,
+                    current_user,
+                    notify,
+                    layers=layers,
+                    checkpoint=checkpoint
+                )
+        except HTTPException as e:
+            if checkpoint and "repo" in checkpoint:
+                e.detail = f"{e.detail} Retry with the same Idempotency-Key to resume."
+            raise
+        return repository.dict()
+    
+    # A duplicate gets the same job while it is queued, running or done;
+    # once it has failed, a retry starts a new job that resumes from the checkpoint
+    return await idempotency_store.run(
+        request,
+        user_id,
+        lambda: job_queue.submit("create_repository", user_id, run),
+        reusable=_job_reusable
+    )
+
+
+@router.post("/repositories/bulk", response_model=Job, status_code=202)
+async def create_repositories(
+    request: Request,
+    bulk_data: BulkCreateRepositoryRequest,
+    current_user: Dict = Depends(get_current_user)
+) -> Job:
+    """
+    Queue creation of many repositories in one job.
+    Each distinct template and overlay combination is loaded once for the
+    whole batch, and at most GITHUB_TOKEN_CONCURRENCY repositories are
+    provisioned at a time per GitHub token. Progress events carry the item
+    index; the job result summarises every item.
+    """
+    auth_header = _require_github_token(request)
+    
+    names = [repo_data.name for repo_data in bulk_data.repositories]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Repository names must be unique: {', '.join(duplicates)}"
         )
-        
-        # Always upload template files
+    
+    # Fail fast on stacks we have no template for
+    templates = []
+    for index, repo_data in enumerate(bulk_data.repositories):
         try:
-            print(f"Starting template upload for repository: {repo_data.name}")
+            template_name = template_registry.select(repo_data.tech_stack)
+        except LookupError as e:
+            raise HTTPException(status_code=422, detail=f"repositories[{index}]: {e}")
+        templates.append((template_name, template_registry.layers_for(repo_data.tech_stack, repo_data.integrations)))
+    
+    user_id = current_user.get("id", "unknown")
+    
+    # Items resume individually when the batch is retried with the same key
+    idempotency_key = request.headers.get("Idempotency-Key")
+    checkpoints = []
+    for repo_data in bulk_data.repositories:
+        checkpoint = None
+        if idempotency_key:
+            key = (user_id, f"{idempotency_key}:{repo_data.name}")
+            checkpoint = provision_checkpoints.get(key)
+            if checkpoint is None:
+                checkpoint = {"name": repo_data.name}
+                provision_checkpoints.set(key, checkpoint)
+        checkpoints.append(checkpoint)
+    
+    async def run(job: Job) -> Dict[str, Any]:
+        notify = partial(manager.send_project_update, user_id, job_id=job.id)
+        gh = github_client.session(auth_header)
+        
+        # Shared template work happens once, before any item starts
+        for template_name, layers in set(templates):
+            await template_registry.load(template_name, layers=layers)
+        await _github_login(gh)
+        
+        async def provision_one(index: int) -> Dict[str, Any]:
+            repo_data = bulk_data.repositories[index]
+            template_name, layers = templates[index]
+            
+            async def item_notify(update_type: str, data: Dict[str, Any]):
+                await notify(update_type, {**data, "item": index, "repository_name": repo_data.name})
+            
+            try:
+                async with _provision_slot(auth_header):
+                    repository = await _provision_repository(
+                        gh,
+                        repo_data,
+                        template_name,
+                        current_user,
+                        item_notify,
+                        layers=layers,
+                        checkpoint=checkpoints[index]
+                    )
+                result = {"name": repo_data.name, "status": "succeeded", "repository": repository.dict()}
+            except HTTPException as e:
+                result = {"name": repo_data.name, "status": "failed", "status_code": e.status_code, "error": e.detail}
+            
+            await item_notify("bulk_item_complete", {"status": result["status"], "error": result.get("error")})
+            return result
+        
+        results = await asyncio.gather(*(provision_one(i) for i in range(len(bulk_data.repositories))))
+        succeeded = sum(1 for result in results if result["status"] == "succeeded")
+        return {
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results
+        }
+    
+    return await idempotency_store.run(
+        request,
+        user_id,
+        lambda: job_queue.submit("create_repositories", user_id, run),
+        reusable=_job_reusable
+    )
+
+
+@asynccontextmanager
+async def _provision_slot(token: str):
+    key = token_key(token)
+    slot = provision_slots.get(key)
+    if slot is None:
+        slot = provision_slots[key] = [asyncio.Semaphore(settings.GITHUB_TOKEN_CONCURRENCY), 0]
+    slot[1] += 1
+    try:
+        async with slot[0]:
+            yield
+    finally:
+        slot[1] -= 1
+        if slot[1] == 0:
+            del provision_slots[key]
+
+
+async def _provision_repository(
+    gh: GitHubSession,
+    repo_data: CreateRepositoryRequest,
+    template_name: str,
+    current_user: Dict,
+    notify: Notify,
+    layers: Tuple[str, ...] = (),
+    checkpoint: Optional[Dict[str, Any]] = None
+) -> RepositoryResponse:
+    """
+    Create the repository, push the template and record the project.
+    Each completed step is recorded in `checkpoint`; running again with the
+    same checkpoint resumes after the last completed step instead of
+    starting over.
+    """
+    checkpoint = checkpoint if checkpoint is not None else {}
+    if "result" in checkpoint:
+        return RepositoryResponse(**checkpoint["result"])
+    
+    # Load the template with its overlays before creating anything on GitHub
+    template = await template_registry.load(template_name, layers=layers)
+    template_version = f"{template.name}@{template.snapshot.version}"
+    pushing = False
+    
+    try:
+        github_user = await gh.get_identity()
+        
+        if "repo" in checkpoint:
+            repo = checkpoint["repo"]
+            await notify(
+                "provisioning_resumed",
+                {"message": "Resuming repository setup", "completed": sorted(checkpoint.get("steps", []))}
+            )
+        else:
+            # Create the repository with auto_init so the default branch exists;
+            # the template commit replaces the generated initial commit
+            repo = await gh.create_repo(
+                name=repo_data.name,
+                description=repo_data.description or f"A new SaaS project created with 5AM Founder",
+                private=repo_data.private,
+                auto_init=True
+            )
+            checkpoint["repo"] = repo
+            _complete_step(checkpoint, "repository_created")
             
             # Send initial WebSocket update
-            await manager.send_project_update(
-                current_user.get("id", "unknown"),
+            await notify(
                 "repository_created",
-                {"repository_name": repo_data.name, "url": repo.html_url}
+                {"repository_name": repo_data.name, "url": repo["html_url"]}
             )
+        
+        # Always upload template files
+        if "commit" not in checkpoint:
+            print(f"Starting template upload for repository: {repo_data.name}")
             
             # Prepare project configuration for template
             project_config = {
                 "name": repo_data.name,
                 "description": repo_data.description or f"A new SaaS project created with 5AM Founder",
-                "github_username": github_user.login,
-                "repo_url": repo.html_url,
+                "github_username": github_user["login"],
+                "repo_url": repo["html_url"],
                 # Add placeholders for Supabase (will be populated later)
                 "supabase_url": "your_supabase_url",
                 "supabase_anon_key": "your_supabase_anon_key", 
@@ -165,155 +409,93 @@ async def create_repository(
             }
             
             # Send template preparation update
-            await manager.send_project_update(
-                current_user.get("id", "unknown"),
+            await notify(
                 "preparing_template",
                 {"message": "Preparing project template with your configuration..."}
             )
             
             # Get all template files with variables replaced
-            template_files = template_service.prepare_template_files(project_config)
+            template_files = template.prepare_template_files(project_config)
             
             print(f"Prepared {len(template_files)} files for upload")
             
             # Send file count update
-            await manager.send_project_update(
-                current_user.get("id", "unknown"),
+            await notify(
                 "template_ready",
                 {"total_files": len(template_files), "message": f"Ready to upload {len(template_files)} files"}
             )
             
-            # Wait a moment for the repository to be fully created
-            await asyncio.sleep(2)
-            
-            # For an empty repository, we need to create at least one file first
-            # to establish the default branch
-            await manager.send_project_update(
-                current_user.get("id", "unknown"),
-                "upload_started",
-                {"message": "Initializing repository..."}
-            )
+            # Wait until the default branch is visible to the Git Data API
+            branch = repo.get("default_branch") or "main"
+            await gh.wait_for_ref(repo["full_name"], f"heads/{branch}")
             
-            # Create README first to establish the main branch
-            initial_readme = f"# {repo_data.name}\n\nInitializing project from 5AM Founder..."
-            repo.create_file(
-                "README.md",
-                "Initial commit from 5AM Founder",
-                initial_readme,
-                branch="main"
+            await notify(
+                "repository_ready",
+                {"message": "Repository is ready", "wait_seconds": round(gh.wait_seconds, 2)}
             )
             
-            # Now wait for the branch to be created
-            await asyncio.sleep(1)
-            
-            # Now upload all template files
-            await manager.send_project_update(
-                current_user.get("id", "unknown"),
-                "upload_progress",
-                {"message": "Uploading template files...", "current": 0, "total": len(template_files)}
+            # Push the whole template as a single parentless commit that
+            # replaces the auto_init commit; the manifest lets later upgrades
+            # tell template changes from the user's own. Blobs uploaded by an
+            # earlier attempt are not uploaded again.
+            uploaded = checkpoint.setdefault("blobs", set())
+            pushing = True
+            commit_sha, transfer = await push_files(
+                gh,
+                repo["full_name"],
+                branch,
+                template_files + [manifest_file(template_version, template_files)],
+                notify,
+                message="Initial commit from 5AM Founder",
+                known_blobs=uploaded,
+                force=True,
+                uploaded=uploaded
             )
+            pushing = False
+            checkpoint["commit"] = commit_sha
+            checkpoint["transfer"] = transfer
+            _complete_step(checkpoint, "template_committed")
             
-            # Upload files in batches to avoid rate limits
-            batch_size = 10
-            uploaded_count = 0
-            
-            for i in range(0, len(template_files), batch_size):
-                batch = template_files[i:i + batch_size]
-                
-                for file_path, content, is_binary in batch:
-                    try:
-                        # Skip README.md as we already created it
-                        if file_path == "README.md":
-                            # Update the README with the actual content
-                            readme_file = repo.get_contents("README.md", ref="main")
-                            repo.update_file(
-                                "README.md",
-                                "Update README from template",
-                                content,
-                                readme_file.sha,
-                                branch="main"
-                            )
-                        else:
-                            # Create new file
-                            if is_binary:
-                                # For binary files, encode to base64
-                                file_content = base64.b64encode(content).decode('utf-8')
-                            else:
-                                file_content = content
-                            
-                            repo.create_file(
-                                file_path,
-                                f"Add {file_path}",
-                                file_content,
-                                branch="main"
-                            )
-                        
-                        uploaded_count += 1
-                        
-                        # Send progress update
-                        if uploaded_count % 5 == 0 or uploaded_count == len(template_files):
-                            await manager.send_project_update(
-                                current_user.get("id", "unknown"),
-                                "upload_progress",
-                                {
-                                    "current": uploaded_count,
-                                    "total": len(template_files),
-                                    "percentage": round((uploaded_count / len(template_files)) * 100),
-                                    "current_file": file_path
-                                }
-                            )
-                        
-                    except Exception as e:
-                        print(f"Error uploading {file_path}: {str(e)}")
-                        await manager.send_project_update(
-                            current_user.get("id", "unknown"),
-                            "file_error",
-                            {"file": file_path, "error": str(e)}
-                        )
-                
-                # Small delay between batches to avoid rate limits
-                if i + batch_size < len(template_files):
-                    await asyncio.sleep(0.5)
-            
-            print("Template upload completed successfully")
-            
-            # Add topics to identify this as a 5AM Founder project
+            print(f"Template upload completed successfully ({commit_sha}): {transfer}")
+        
+        # Add topics to identify this as a 5AM Founder project
+        if "topics_added" not in checkpoint.get("steps", ()):
             try:
-                repo.replace_topics(["5am-founder", "nextjs", "supabase", "typescript"])
+                await gh.replace_topics(repo["full_name"], ["5am-founder", "nextjs", "supabase", "typescript"])
+                _complete_step(checkpoint, "topics_added")
                 print("Added 5AM Founder topics to repository")
             except Exception as e:
                 print(f"Warning: Could not add topics: {str(e)}")
-            
-            # Send completion update
-            await manager.send_project_update(
-                current_user.get("id", "unknown"),
-                "upload_complete",
-                {
-                    "message": "All files uploaded successfully!",
-                    "total_files": len(template_files),
-                    "repository_url": repo.html_url
-                }
-            )
-        except Exception as e:
-            # Repository was created but we couldn't upload all template files
-            # This is okay, the repo still exists
-            print(f"Warning: Could not upload all template files: {str(e)}")
+        
+        # Send completion update
+        await notify(
+            "upload_complete",
+            {
+                "message": "All files uploaded successfully!",
+                "total_files": checkpoint["transfer"]["files"],
+                "repository_url": repo["html_url"],
+                "wait_seconds": round(gh.wait_seconds, 2),
+                "transfer": checkpoint["transfer"]
+            }
+        )
         
         # Refresh repo data to get updated topics
-        repo = g.get_repo(repo.full_name)
+        repo = await gh.get_repo(repo["full_name"])
         
         # Insert project into Supabase database
         try:
-            if supabase_client:
+            if "project_saved" in checkpoint.get("steps", ()):
+                pass
+            elif supabase_client:
                 project_data = {
                     "user_id": current_user.get("id"),
-                    "name": repo.name,
-                    "description": repo.description or f"A new SaaS project created with 5AM Founder",
-                    "github_repo_url": repo.html_url,
-                    "github_repo_id": repo.id,
-                    "is_private": repo.private,
+                    "name": repo["name"],
+                    "description": repo["description"] or f"A new SaaS project created with 5AM Founder",
+                    "github_repo_url": repo["html_url"],
+                    "github_repo_id": repo["id"],
+                    "is_private": repo["private"],
                     "github_topics": ["5am-founder", "nextjs", "supabase", "typescript"],
-                    "template_version": "1.0.0",
+                    "template_version": template_version,
                     "has_supabase_db": False,  # Will be updated when Supabase is configured
                     "auth_providers": [],      # Will be updated when auth is configured
                     "has_stripe": False,       # Will be updated when Stripe is configured
@@ -322,11 +504,11 @@ async def create_repository(
                 }
                 
                 result = supabase_client.table("projects").insert(project_data).execute()
+                _complete_step(checkpoint, "project_saved")
                 print(f"Project saved to database: {result.data}")
                 
                 # Send database update to websocket
-                await manager.send_project_update(
-                    current_user.get("id", "unknown"),
+                await notify(
                     "project_saved",
                     {"message": "Project saved to 5AM Founder database"}
                 )
@@ -336,34 +518,37 @@ async def create_repository(
             # Log the error but don't fail the repository creation
             print(f"Error saving project to database: {str(e)}")
             # Still send a warning to the user
-            await manager.send_project_update(
-                current_user.get("id", "unknown"),
+            await notify(
                 "database_warning",
                 {"message": "Repository created successfully, but could not save to project database"}
             )
         
-        return RepositoryResponse(
-            id=repo.id,
-            name=repo.name,
-            full_name=repo.full_name,
-            html_url=repo.html_url,
-            clone_url=repo.clone_url,
-            ssh_url=repo.ssh_url,
-            private=repo.private,
-            description=repo.description or f"A new SaaS project created with 5AM Founder"
+        response = RepositoryResponse(
+            id=repo["id"],
+            name=repo["name"],
+            full_name=repo["full_name"],
+            html_url=repo["html_url"],
+            clone_url=repo["clone_url"],
+            ssh_url=repo["ssh_url"],
+            private=repo["private"],
+            description=repo["description"] or f"A new SaaS project created with 5AM Founder"
         )
+        checkpoint["result"] = response.dict()
+        return response
         
-    except GithubException as e:
-        error_message = e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)
+    except GitHubAPIError as e:
+        error_message = e.message or str(e)
         
-        if e.status == 404:
-            # Check current OAuth scopes
-            import requests
-            scope_check = requests.get(
-                "https://api.github.com/user",
-                headers={"Authorization": f"Bearer {auth_header}"}
+        if pushing and e.status not in (401, 403):
+            # A blob, tree, commit or ref request failed; the repository
+            # exists and a retry resumes the upload
+            raise HTTPException(
+                status_code=502,
+                detail=f"Failed to upload template files to GitHub: {error_message}"
             )
-            current_scopes = scope_check.headers.get("x-oauth-scopes", "none")
+        elif e.status == 404:
+            # Check current OAuth scopes
+            current_scopes = await _get_oauth_scopes(gh)
             
             if "repo" not in current_scopes:
                 raise HTTPException(
@@ -389,12 +574,7 @@ async def create_repository(
                 )
         elif e.status == 403:
             # Check OAuth scopes
-            import requests
-            scope_check = requests.get(
-                "https://api.github.com/user",
-                headers={"Authorization": f"Bearer {auth_header}"}
-            )
-            current_scopes = scope_check.headers.get("x-oauth-scopes", "none")
+            current_scopes = await _get_oauth_scopes(gh)
             
             raise HTTPException(
                 status_code=403,
@@ -417,12 +597,43 @@ async def create_repository(
         )
 
 
+def _job_reusable(job: Job) -> bool:
+    """Whether a stored job can be handed back to a duplicate request"""
+    return job_queue.get(job.id) is not None and job.status != JobStatus.FAILED
+
+
+def _complete_step(checkpoint: Dict[str, Any], step: str):
+    checkpoint.setdefault("steps", []).append(step)
+
+
+async def _get_oauth_scopes(gh: GitHubSession) -> str:
+    """Get the token's OAuth scopes for error messages"""
+    try:
+        identity = await gh.get_identity()
+        return identity["scopes"] or "none"
+    except GitHubAPIError:
+        return "none"
+
+
 @router.get("/repositories")
 async def list_repositories(
     request: Request,
+    response: Response,
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    founder_only: bool = False,
     current_user: Dict = Depends(get_current_user)
-) -> List[RepositoryResponse]:
-    """List user's GitHub repositories"""
+) -> List[Dict[str, Any]]:
+    """
+    List user's GitHub repositories, most recently updated first.
+    Pages are requested with `page_size` and the opaque `cursor` from the
+    previous page's X-Next-Cursor header. `fields` is a comma-separated
+    subset of RepositoryResponse fields to return, and `founder_only`
+    restricts the listing to repositories tagged 5am-founder.
+    The listing is revalidated against GitHub with its ETag, so unchanged
+    listings are served from cache, and our own ETag lets clients do the same.
+    """
     auth_header = request.headers.get("X-GitHub-Token")
     if not auth_header:
         raise HTTPException(
@@ -430,26 +641,76 @@ async def list_repositories(
             detail="GitHub token not found. Please authenticate with GitHub first."
         )
     
+    page = _decode_cursor(cursor)
+    selected_fields = _parse_fields(fields)
+    
     try:
-        g = Github(auth_header)
-        github_user = g.get_user()
-        
-        repos = []
-        for repo in github_user.get_repos(sort="updated", direction="desc")[:20]:
-            repos.append(RepositoryResponse(
-                id=repo.id,
-                name=repo.name,
-                full_name=repo.full_name,
-                html_url=repo.html_url,
-                clone_url=repo.clone_url,
-                ssh_url=repo.ssh_url,
-                private=repo.private,
-                description=repo.description
-            ))
+        gh = github_client.session(auth_header)
+        cache_key = (token_key(auth_header), page_size, page, fields, founder_only)
+        cached = repo_list_cache.get(cache_key)
+        etag = cached[0] if cached else None
+        
+        if founder_only:
+            # Let GitHub filter by topic instead of walking every repository
+            identity = await gh.get_identity()
+            result = await gh.search_repos(
+                f"user:{identity['login']} topic:5am-founder fork:true",
+                sort="updated",
+                order="desc",
+                per_page=page_size,
+                page=page,
+                etag=etag
+            )
+        else:
+            result = await gh.list_repos(
+                sort="updated",
+                direction="desc",
+                per_page=page_size,
+                page=page,
+                etag=etag
+            )
+        
+        if result.items is None:
+            # 304 from GitHub: the cached listing is still current
+            repo_list_stats["hits"] += 1
+            _, repos, etag, next_cursor = cached
+        else:
+            repo_list_stats["misses"] += 1
+            if selected_fields:
+                repos = [
+                    {field: repo.get(field) for field in selected_fields}
+                    for repo in result.items
+                ]
+            else:
+                repos = [
+                    RepositoryResponse(
+                        id=repo["id"],
+                        name=repo["name"],
+                        full_name=repo["full_name"],
+                        html_url=repo["html_url"],
+                        clone_url=repo["clone_url"],
+                        ssh_url=repo["ssh_url"],
+                        private=repo["private"],
+                        description=repo["description"]
+                    ).dict()
+                    for repo in result.items
+                ]
+            etag = '"' + hashlib.sha1(json.dumps(repos, sort_keys=True).encode()).hexdigest() + '"'
+            next_cursor = _encode_cursor(page + 1) if result.has_next else None
+            if result.etag:
+                repo_list_cache.set(cache_key, (result.etag, repos, etag, next_cursor))
         
+        headers = {"ETag": etag}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers=headers)
+        
+        response.headers.update(headers)
         return repos
         
-    except GithubException as e:
+    except GitHubAPIError as e:
         if e.status == 401:
             raise HTTPException(
                 status_code=401,
@@ -463,7 +724,7 @@ async def list_repositories(
         else:
             raise HTTPException(
                 status_code=e.status,
-                detail=f"GitHub API error: {e.data.get('message', str(e))}"
+                detail=f"GitHub API error: {e.message or str(e)}"
             )
     except Exception as e:
         raise HTTPException(
@@ -472,6 +733,332 @@ async def list_repositories(
         )
 
 
+def _encode_cursor(page: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"page": page}).encode()).decode()
+
+
+def _decode_cursor(cursor: Optional[str]) -> int:
+    """Get the page number from a listing cursor"""
+    if not cursor:
+        return 1
+    try:
+        page = int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["page"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if page < 1:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return page
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma-separated field projection against RepositoryResponse"""
+    if not fields:
+        return []
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in RepositoryResponse.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return selected
+
+
+@router.post("/repositories/upgrade", response_model=Job, status_code=202)
+async def upgrade_repositories(
+    request: Request,
+    upgrade_data: BulkUpgradeRequest,
+    current_user: Dict = Depends(get_current_user)
+) -> Job:
+    """
+    Queue template upgrades for many repositories, given as owner/name.
+    Repositories are upgraded concurrently up to TEMPLATE_UPGRADE_CONCURRENCY;
+    the job result lists the outcome for each one.
+    """
+    auth_header = _require_github_token(request)
+    _check_upgrade_mode(upgrade_data.mode)
+    user_id = current_user.get("id", "unknown")
+    
+    async def run(job: Job) -> Dict[str, Any]:
+        gh = github_client.session(auth_header)
+        notify = partial(manager.send_project_update, user_id, job_id=job.id)
+        login = await _github_login(gh)
+        recorded = await asyncio.to_thread(_recorded_template_versions, user_id)
+        semaphore = asyncio.Semaphore(settings.TEMPLATE_UPGRADE_CONCURRENCY)
+        
+        async def upgrade_one(full_name: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    result = await _upgrade_repository(gh, full_name, login, upgrade_data.mode, recorded, notify)
+                except HTTPException as e:
+                    result = {"status": "failed", "error": e.detail}
+                except Exception as e:
+                    result = {"status": "failed", "error": str(e)}
+            await notify("repository_upgraded", {"repository": full_name, "status": result["status"]})
+            return {"repository": full_name, **result}
+        
+        results = await asyncio.gather(*(upgrade_one(name) for name in upgrade_data.repositories))
+        return {"results": results}
+    
+    return await idempotency_store.run(
+        request,
+        user_id,
+        lambda: job_queue.submit("upgrade_repositories", user_id, run),
+        reusable=_job_reusable
+    )
+
+
+@router.post("/repositories/{owner}/{repo}/upgrade", response_model=Job, status_code=202)
+async def upgrade_repository_template(
+    owner: str,
+    repo: str,
+    request: Request,
+    upgrade_data: UpgradeRequest = UpgradeRequest(),
+    current_user: Dict = Depends(get_current_user)
+) -> Job:
+    """
+    Queue an upgrade of a generated repository to the current template.
+    Only files that changed in the template and that the user has not edited
+    are written, as one commit (mode "commit") or a pull request
+    (mode "pull_request").
+    """
+    auth_header = _require_github_token(request)
+    _check_upgrade_mode(upgrade_data.mode)
+    user_id = current_user.get("id", "unknown")
+    
+    async def run(job: Job) -> Dict[str, Any]:
+        gh = github_client.session(auth_header)
+        notify = partial(manager.send_project_update, user_id, job_id=job.id)
+        login = await _github_login(gh)
+        return await _upgrade_repository(
+            gh,
+            f"{owner}/{repo}",
+            login,
+            upgrade_data.mode,
+            await asyncio.to_thread(_recorded_template_versions, user_id),
+            notify
+        )
+    
+    return await idempotency_store.run(
+        request,
+        user_id,
+        lambda: job_queue.submit("upgrade_repository", user_id, run),
+        reusable=_job_reusable
+    )
+
+
+def _require_github_token(request: Request) -> str:
+    auth_header = request.headers.get("X-GitHub-Token")
+    if not auth_header:
+        raise HTTPException(
+            status_code=401,
+            detail="GitHub token not found. Please authenticate with GitHub first."
+        )
+    return auth_header
+
+
+async def _github_login(gh: GitHubSession) -> str:
+    """The token owner's login, for jobs that check ownership up front"""
+    try:
+        return (await gh.get_identity())["login"]
+    except GitHubAPIError as e:
+        if e.status == 401:
+            raise HTTPException(
+                status_code=401,
+                detail="GitHub token is invalid or expired. Please reconnect your GitHub account."
+            )
+        elif e.status == 403:
+            raise HTTPException(
+                status_code=403,
+                detail=f"Permission denied: {e.message or str(e)}"
+            )
+        raise HTTPException(
+            status_code=e.status,
+            detail=f"GitHub API error: {e.message or str(e)}"
+        )
+
+
+def _check_upgrade_mode(mode: str):
+    if mode not in UPGRADE_MODES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown upgrade mode: {mode}. Use one of: {', '.join(UPGRADE_MODES)}"
+        )
+
+
+def _recorded_template_versions(user_id: str) -> Dict[str, str]:
+    """Template version per repository URL for the user's projects"""
+    if not supabase_client:
+        return {}
+    try:
+        result = supabase_client.table("projects").select(
+            "github_repo_url, template_version"
+        ).eq("user_id", user_id).execute()
+        return {
+            row["github_repo_url"]: row["template_version"]
+            for row in result.data
+            if row.get("template_version")
+        }
+    except Exception as e:
+        print(f"Error reading template versions from database: {str(e)}")
+        return {}
+
+
+async def _upgrade_repository(
+    gh: GitHubSession,
+    full_name: str,
+    login: str,
+    mode: str,
+    recorded: Dict[str, str],
+    notify: Notify
+) -> Dict[str, Any]:
+    """Upgrade one repository the user owns and record its new template version"""
+    owner = full_name.split("/", 1)[0]
+    if owner != login:
+        raise HTTPException(
+            status_code=403,
+            detail="You can only upgrade repositories you own."
+        )
+    
+    try:
+        repo = await gh.get_repo(full_name)
+        result = await upgrade_repository(
+            gh,
+            repo,
+            login,
+            notify,
+            mode=mode,
+            recorded_version=recorded.get(repo["html_url"])
+        )
+    except GitHubAPIError as e:
+        if e.status == 404:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Repository {full_name} not found."
+            )
+        raise HTTPException(
+            status_code=e.status,
+            detail=f"GitHub API error: {e.message or str(e)}"
+        )
+    
+    # A pull request only changes the project once it is merged
+    if result["status"] == "upgraded" and mode == "commit" and supabase_client:
+        try:
+            await asyncio.to_thread(
+                supabase_client.table("projects").update(
+                    {"template_version": result["template_version"]}
+                ).eq("github_repo_id", repo["id"]).execute
+            )
+        except Exception as e:
+            print(f"Error recording template version: {str(e)}")
+    
+    return result
+
+
+@router.post("/repositories/bulk-delete", response_model=Job, status_code=202)
+async def delete_repositories(
+    request: Request,
+    delete_data: BulkDeleteRequest,
+    current_user: Dict = Depends(get_current_user)
+) -> Job:
+    """
+    Queue deletion or archiving of many repositories and their projects.
+    Ownership is resolved once for the batch, GitHub calls run with bounded
+    concurrency, and the matching projects rows change in one statement.
+    The job result reports each repository separately.
+    """
+    auth_header = _require_github_token(request)
+    if delete_data.mode not in ("delete", "archive"):
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown mode: {delete_data.mode}. Use one of: delete, archive"
+        )
+    
+    user_id = current_user.get("id", "unknown")
+    archive = delete_data.mode == "archive"
+    
+    async def run(job: Job) -> Dict[str, Any]:
+        gh = github_client.session(auth_header)
+        notify = partial(manager.send_project_update, user_id, job_id=job.id)
+        login = await _github_login(gh)
+        semaphore = asyncio.Semaphore(settings.GITHUB_TOKEN_CONCURRENCY)
+        
+        async def remove_one(full_name: str) -> Dict[str, Any]:
+            if full_name.split("/", 1)[0] != login:
+                return {"repository": full_name, "status": "failed", "error": "You can only delete repositories you own."}
+            try:
+                async with semaphore:
+                    if archive:
+                        await gh.update_repo(full_name, archived=True)
+                    else:
+                        await gh.delete_repo(full_name)
+                result = {"repository": full_name, "status": "archived" if archive else "deleted"}
+            except GitHubAPIError as e:
+                if e.status == 404:
+                    # Already gone from GitHub; its project row is stale either way
+                    result = {"repository": full_name, "status": "not_found"}
+                elif e.status == 403 and not archive:
+                    result = {
+                        "repository": full_name,
+                        "status": "failed",
+                        "error": f"Permission denied: {e.message}. Repository deletion requires the 'delete_repo' scope."
+                    }
+                else:
+                    result = {"repository": full_name, "status": "failed", "error": f"GitHub API error: {e.message or str(e)}"}
+            await notify("repository_removed", result)
+            return result
+        
+        results = await asyncio.gather(*(remove_one(name) for name in delete_data.repositories))
+        
+        removed = {r["repository"].lower() for r in results if r["status"] != "failed"}
+        projects_updated = await asyncio.to_thread(_remove_projects, user_id, removed, archive) if removed else 0
+        
+        return {
+            "total": len(results),
+            "failed": sum(1 for r in results if r["status"] == "failed"),
+            "projects_updated": projects_updated,
+            "results": results
+        }
+    
+    return await idempotency_store.run(
+        request,
+        user_id,
+        lambda: job_queue.submit("delete_repositories", user_id, run),
+        reusable=_job_reusable
+    )
+
+
+def _remove_projects(user_id: str, full_names: set, archive: bool) -> int:
+    """Delete or deactivate the user's projects for `full_names` in one statement"""
+    if not supabase_client:
+        print("Warning: Could not update projects in database - Supabase client not available")
+        return 0
+    
+    try:
+        # One read to map repositories to the user's projects
+        rows = supabase_client.table("projects").select(
+            "id, github_repo_url"
+        ).eq("user_id", user_id).execute().data
+        ids = [
+            row["id"] for row in rows
+            if row.get("github_repo_url", "").lower().removeprefix("https://github.com/") in full_names
+        ]
+        if not ids:
+            return 0
+        
+        table = supabase_client.table("projects")
+        if archive:
+            query = table.update({"is_active": False, "updated_at": datetime.utcnow().isoformat()})
+        else:
+            query = table.delete()
+        result = query.in_("id", ids).eq("user_id", user_id).execute()
+        return len(result.data or [])
+    except Exception as e:
+        # Log the error but don't fail the GitHub side, which already happened
+        print(f"Error updating projects in database: {str(e)}")
+        return 0
+
+
 @router.delete("/repositories/{owner}/{repo}")
 async def delete_repository(
     owner: str,
@@ -487,12 +1074,20 @@ async def delete_repository(
             detail="GitHub token not found. Please authenticate with GitHub first."
         )
     
+    # A retried delete gets the first response instead of a 404
+    return await idempotency_store.run(
+        request,
+        current_user.get("id", "unknown"),
+        lambda: _delete_repository(github_client.session(auth_header), owner, repo)
+    )
+
+
+async def _delete_repository(gh: GitHubSession, owner: str, repo: str) -> Dict[str, str]:
     try:
-        g = Github(auth_header)
-        github_user = g.get_user()
+        github_user = await gh.get_identity()
         
         # Verify the user owns the repository
-        if github_user.login != owner:
+        if github_user["login"] != owner:
             raise HTTPException(
                 status_code=403,
                 detail="You can only delete repositories you own."
@@ -500,9 +1095,9 @@ async def delete_repository(
         
         # Get the repository
         try:
-            repository = g.get_repo(f"{owner}/{repo}")
-            repo_id = repository.id  # Store the ID before deletion
-        except GithubException as e:
+            repository = await gh.get_repo(f"{owner}/{repo}")
+            repo_id = repository["id"]  # Store the ID before deletion
+        except GitHubAPIError as e:
             if e.status == 404:
                 raise HTTPException(
                     status_code=404,
@@ -526,21 +1121,16 @@ async def delete_repository(
             print(f"Error deleting project from database: {str(e)}")
         
         # Delete the repository from GitHub
-        repository.delete()
+        await gh.delete_repo(repository["full_name"])
         
         return {"message": f"Repository {owner}/{repo} deleted successfully."}
         
-    except GithubException as e:
-        error_message = e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)
+    except GitHubAPIError as e:
+        error_message = e.message or str(e)
         
         if e.status == 403:
             # Check current OAuth scopes
-            import requests
-            scope_check = requests.get(
-                "https://api.github.com/user",
-                headers={"Authorization": f"Bearer {auth_header}"}
-            )
-            current_scopes = scope_check.headers.get("x-oauth-scopes", "none")
+            current_scopes = await _get_oauth_scopes(gh)
             
             if 'delete_repo' not in current_scopes:
                 raise HTTPException(
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict
+
+from ..auth.auth import get_current_user
+from ..models.job import Job
+from ..services.job_queue import job_queue
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    current_user: Dict = Depends(get_current_user)
+) -> Job:
+    """Get the status of a background job"""
+    job = job_queue.get(job_id)
+    
+    # Don't reveal other users' jobs
+    if not job or job.user_id != current_user.get("id"):
+        raise HTTPException(
+            status_code=404,
+            detail="Job not found"
+        )
+    
+    return job
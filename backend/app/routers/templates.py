@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..auth.auth import get_current_user
+from ..services.template_export import ARCHIVE_FORMATS
+from ..services.template_registry import template_registry
+
+router = APIRouter(prefix="/api/v1/templates", tags=["templates"])
+
+# Project names become the archive's root directory, so keep them to what
+# GitHub accepts in repository names. A leading dot is refused so "." and
+# ".." cannot point extraction outside the target directory.
+PROJECT_NAME_PATTERN = r"^[A-Za-z0-9_-][A-Za-z0-9._-]*$"
+
+
+class ExportRequest(BaseModel):
+    name: str = Field(..., pattern=PROJECT_NAME_PATTERN)
+    description: Optional[str] = None
+    format: str = "zip"
+    tech_stack: Optional[Dict[str, Any]] = None
+    integrations: Optional[Dict[str, Any]] = None
+
+
+@router.get("/export")
+async def export_template(
+    name: str = Query(..., pattern=PROJECT_NAME_PATTERN),
+    description: Optional[str] = None,
+    format: str = "zip",
+    template: Optional[str] = None,
+    layers: List[str] = Query([]),
+    current_user: Dict = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Download a rendered project as a zip or tar.gz without creating a repository.
+    Overlays are named explicitly with repeated `layers` parameters.
+    """
+    return await _stream_export(
+        template or template_registry.default_name,
+        layers,
+        name,
+        description,
+        format
+    )
+
+
+@router.post("/export")
+async def export_project(
+    export_data: ExportRequest,
+    current_user: Dict = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Download the project create_repository would push for the same request,
+    as a zip or tar.gz.
+    """
+    try:
+        template_name = template_registry.select(export_data.tech_stack)
+    except LookupError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return await _stream_export(
+        template_name,
+        template_registry.layers_for(export_data.tech_stack, export_data.integrations),
+        export_data.name,
+        export_data.description,
+        export_data.format
+    )
+
+
+async def _stream_export(
+    template_name: str,
+    layers: Sequence[str],
+    name: str,
+    description: Optional[str],
+    format: str
+) -> StreamingResponse:
+    """Render the template file by file straight into the archive stream"""
+    archive_format = ARCHIVE_FORMATS.get(format)
+    if archive_format is None:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unsupported archive format: {format}. Use one of: {', '.join(ARCHIVE_FORMATS)}"
+        )
+
+    try:
+        template = await template_registry.load(template_name, layers=layers)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+    project_config = {
+        "name": name,
+        "description": description or "A new SaaS project created with 5AM Founder"
+    }
+
+    # A sync iterator, so Starlette compresses in its threadpool rather than
+    # on the event loop
+    files = template.iter_template_files(project_config)
+    return StreamingResponse(
+        archive_format.write(files, name),
+        media_type=archive_format.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{archive_format.extension}"',
+            "X-Template-Version": f"{template.name}@{template.snapshot.version}"
+        }
+    )
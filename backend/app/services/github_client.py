@@ -0,0 +1,515 @@
+import asyncio
+import base64
+import hashlib
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Any, Tuple
+
+import httpx
+
+from ..cache import TTLCache
+from ..config import get_settings
+
+settings = get_settings()
+
+
+# Server-side failures worth retrying
+TRANSIENT_STATUSES = frozenset({500, 502, 503, 504})
+
+
+def token_key(token: str) -> str:
+    """Stable, non-reversible cache key for a GitHub token"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class GitHubAPIError(Exception):
+    """Error response from the GitHub REST API"""
+
+    def __init__(self, status: int, data: Any, headers: Optional[httpx.Headers] = None):
+        self.status = status
+        self.data = data if isinstance(data, dict) else {"message": str(data)}
+        self.headers = headers or httpx.Headers()
+        super().__init__(f"{status} {self.message}")
+
+    @property
+    def message(self) -> str:
+        return self.data.get("message", "")
+
+
+class Page(NamedTuple):
+    """One page of a GitHub listing"""
+    # None when a conditional request was answered with 304 Not Modified
+    items: Optional[List[Dict[str, Any]]]
+    etag: Optional[str]
+    has_next: bool
+
+
+class RateLimitState:
+    """
+    What GitHub last told us about one token's rate limit.
+    Requests are spread evenly over the rest of the window once the remaining
+    budget runs low, and held back entirely while a Retry-After is pending.
+    """
+
+    # Start pacing once fewer requests than this remain in the window
+    LOW_WATERMARK = 50
+
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        # Earliest time the next request may start
+        self.next_at = 0.0
+
+    def update(self, headers: httpx.Headers):
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is not None and reset is not None:
+            self.remaining = int(remaining)
+            self.reset_at = float(reset)
+
+    def delay(self) -> float:
+        """
+        Seconds the next request must wait: a pending Retry-After, or the
+        reset of a window with no requests left
+        """
+        now = time.time()
+        delay = max(0.0, self.blocked_until - now)
+        if self.remaining is not None and self.remaining <= 0 and self.reset_at > now:
+            delay = max(delay, self.reset_at - now)
+        return delay
+
+    def pacing(self) -> float:
+        """Seconds to leave between requests to spread a low budget over the window"""
+        now = time.time()
+        if self.remaining is not None and 0 < self.remaining < self.LOW_WATERMARK and self.reset_at > now:
+            return (self.reset_at - now) / self.remaining
+        return 0.0
+
+    def schedule(self, delay: float, max_interval: float) -> float:
+        """
+        Reserve the next request slot, at least `delay` seconds from now, and
+        return the seconds until it. Each slot pushes the next one back by the
+        pacing interval (at most `max_interval`), so concurrent requests are
+        spaced out instead of all waking together.
+        """
+        now = time.time()
+        start = max(self.next_at, now + delay)
+        self.next_at = start + min(self.pacing(), max_interval)
+        self.reserve()
+        return start - now
+
+    def reserve(self):
+        """Count a request against the budget before its response arrives"""
+        if self.remaining is not None:
+            self.remaining -= 1
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """
+        Seconds to back off before retrying a 403/429, or None when the
+        response is a real permission error rather than a rate limit.
+        """
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            return float(retry_after)
+        if response.headers.get("x-ratelimit-remaining") == "0":
+            return max(0.0, self.reset_at - time.time()) + 1
+        if response.status_code == 429 or "secondary rate limit" in response.text.lower():
+            # GitHub asks for at least a minute when no Retry-After is given
+            return 60.0 * (2 ** attempt)
+        return None
+
+    def block_for(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+
+class GitHubClient:
+    """
+    Non-blocking GitHub REST client shared by the whole process.
+    One keep-alive connection pool serves every token, and a semaphore bounds
+    how many requests are in flight at once so a burst of repository
+    creations cannot starve the rest of the event loop. Each token is paced
+    from GitHub's rate-limit headers, and rate-limited requests are retried
+    after the wait GitHub asks for. Transient failures (5xx, network errors)
+    are retried with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://api.github.com",
+        max_connections: int = 20,
+        max_concurrent_requests: int = 10,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        max_rate_limit_wait: float = 60.0,
+        retry_base_delay: float = 0.5,
+        identity_cache_ttl: float = 300.0,
+        identity_cache_size: int = 1024
+    ):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_concurrent_requests = max_concurrent_requests
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.retry_base_delay = retry_base_delay
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Both keyed by token_key(token)
+        self._rate_limits = TTLCache(maxsize=identity_cache_size, ttl=3600)
+        self.identities = TTLCache(maxsize=identity_cache_size, ttl=identity_cache_ttl)
+
+    def _get_http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                headers={
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": "2022-11-28"
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._http
+
+    async def request(
+        self,
+        token: str,
+        method: str,
+        path: str,
+        *,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        on_wait: Optional[Callable[[float], None]] = None,
+        retry_transient: Optional[bool] = None
+    ) -> httpx.Response:
+        """
+        Send a request with the given token, raising GitHubAPIError on 4xx/5xx.
+        Time spent waiting on rate limits and retries is reported through
+        `on_wait`. Transient failures are retried unless `retry_transient` is
+        False; by default only non-POST requests are, as repeating a POST
+        could create something twice.
+        """
+        if retry_transient is None:
+            retry_transient = method != "POST"
+
+        http = self._get_http()
+        request_headers = {"Authorization": f"Bearer {token}"}
+        if headers:
+            request_headers.update(headers)
+
+        key = token_key(token)
+        state = self._rate_limits.get(key)
+        if state is None:
+            state = RateLimitState()
+            self._rate_limits.set(key, state)
+
+        for attempt in range(self.max_retries + 1):
+            delay = state.delay()
+            if delay > self.max_rate_limit_wait:
+                raise GitHubAPIError(429, {
+                    "message": f"GitHub rate limit exhausted. Try again in {int(delay)} seconds."
+                })
+            # Pacing only slows requests down while budget remains; never fail on it
+            delay = state.schedule(delay, self.max_rate_limit_wait)
+            if delay > 0:
+                # Wait outside the semaphore so other tokens are not held up
+                await asyncio.sleep(delay)
+                if on_wait:
+                    on_wait(delay)
+
+            async with self._semaphore:
+                try:
+                    response = await http.request(
+                        method, path, json=json, params=params, headers=request_headers
+                    )
+                except httpx.TransportError:
+                    if not retry_transient or attempt >= self.max_retries:
+                        raise
+                    response = None
+            if response is None:
+                # Back off outside the semaphore
+                await self._backoff(attempt, on_wait)
+                continue
+            state.update(response.headers)
+
+            if response.status_code in (403, 429) and attempt < self.max_retries:
+                retry_delay = state.retry_delay(response, attempt)
+                if retry_delay is not None:
+                    state.block_for(retry_delay)
+                    continue
+            if response.status_code in TRANSIENT_STATUSES and retry_transient and attempt < self.max_retries:
+                await self._backoff(attempt, on_wait)
+                continue
+            break
+
+        if response.status_code == 401:
+            # The token was revoked or expired; forget who it belonged to
+            self.identities.pop(key)
+
+        if response.status_code >= 400:
+            try:
+                data = response.json()
+            except ValueError:
+                data = {"message": response.text}
+            raise GitHubAPIError(response.status_code, data, response.headers)
+
+        return response
+
+    async def _backoff(self, attempt: int, on_wait: Optional[Callable[[float], None]]):
+        """Sleep a random time up to base * 2^attempt so retries spread out"""
+        delay = random.uniform(0, self.retry_base_delay * 2 ** attempt)
+        await asyncio.sleep(delay)
+        if on_wait:
+            on_wait(delay)
+
+    def session(self, token: str) -> "GitHubSession":
+        """Get an API wrapper bound to a user's token"""
+        return GitHubSession(self, token)
+
+    async def close(self):
+        """Close the shared connection pool"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+class GitHubSession:
+    """GitHub REST endpoints used by the app, bound to one user's token"""
+
+    def __init__(self, client: GitHubClient, token: str):
+        self.client = client
+        self.token = token
+        # Total seconds this session spent waiting on GitHub
+        self.wait_seconds = 0.0
+
+    def _record_wait(self, seconds: float):
+        self.wait_seconds += seconds
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        return await self.client.request(
+            self.token, method, path, on_wait=self._record_wait, **kwargs
+        )
+
+    async def get_user(self) -> Tuple[Dict[str, Any], str]:
+        """Get the authenticated user and the token's OAuth scopes"""
+        response = await self._request("GET", "/user")
+        user = response.json()
+        scopes = response.headers.get("x-oauth-scopes", "")
+        self.client.identities.set(token_key(self.token), {
+            "login": user["login"],
+            "id": user["id"],
+            "scopes": scopes
+        })
+        return user, scopes
+
+    async def get_identity(self) -> Dict[str, Any]:
+        """
+        Get {login, id, scopes} for the token, served from the process-wide
+        identity cache when possible so most requests skip the /user round trip.
+        """
+        identity = self.client.identities.get(token_key(self.token))
+        if identity is None:
+            await self.get_user()
+            identity = self.client.identities.get(token_key(self.token))
+        return identity
+
+    async def create_repo(
+        self,
+        name: str,
+        description: str,
+        private: bool,
+        auto_init: bool
+    ) -> Dict[str, Any]:
+        response = await self._request("POST", "/user/repos", json={
+            "name": name,
+            "description": description,
+            "private": private,
+            "auto_init": auto_init
+        })
+        return response.json()
+
+    async def get_repo(self, full_name: str) -> Dict[str, Any]:
+        response = await self._request("GET", f"/repos/{full_name}")
+        return response.json()
+
+    async def delete_repo(self, full_name: str):
+        await self._request("DELETE", f"/repos/{full_name}")
+
+    async def update_repo(self, full_name: str, **fields: Any) -> Dict[str, Any]:
+        """Change repository settings, e.g. archived=True"""
+        response = await self._request("PATCH", f"/repos/{full_name}", json=fields)
+        return response.json()
+
+    async def _get_page(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        etag: Optional[str] = None,
+        items_key: Optional[str] = None
+    ) -> Page:
+        """
+        Fetch one page of a listing. With `etag`, the request is conditional
+        and a 304 Not Modified, which costs no rate limit, yields no items.
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        response = await self._request("GET", path, params=params, headers=headers)
+        if response.status_code == 304:
+            return Page(None, etag, False)
+        data = response.json()
+        items = data[items_key] if items_key else data
+        return Page(items, response.headers.get("etag"), "next" in response.links)
+
+    async def list_repos(
+        self,
+        sort: str = "updated",
+        direction: str = "desc",
+        per_page: int = 30,
+        page: int = 1,
+        etag: Optional[str] = None
+    ) -> Page:
+        """List repositories the user can access"""
+        return await self._get_page("/user/repos", {
+            "sort": sort,
+            "direction": direction,
+            "per_page": per_page,
+            "page": page
+        }, etag)
+
+    async def search_repos(
+        self,
+        query: str,
+        sort: str = "updated",
+        order: str = "desc",
+        per_page: int = 30,
+        page: int = 1,
+        etag: Optional[str] = None
+    ) -> Page:
+        """Search repositories, e.g. by owner and topic"""
+        return await self._get_page("/search/repositories", {
+            "q": query,
+            "sort": sort,
+            "order": order,
+            "per_page": per_page,
+            "page": page
+        }, etag, items_key="items")
+
+    async def replace_topics(self, full_name: str, topics: List[str]):
+        await self._request("PUT", f"/repos/{full_name}/topics", json={"names": topics})
+
+    async def create_blob(self, full_name: str, content: str, encoding: str) -> Dict[str, Any]:
+        response = await self._request("POST", f"/repos/{full_name}/git/blobs", json={
+            "content": content,
+            "encoding": encoding
+        }, retry_transient=True)
+        return response.json()
+
+    async def create_tree(
+        self,
+        full_name: str,
+        tree: List[Dict[str, Any]],
+        base_tree: Optional[str] = None
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"tree": tree}
+        if base_tree:
+            payload["base_tree"] = base_tree
+        response = await self._request("POST", f"/repos/{full_name}/git/trees", json=payload, retry_transient=True)
+        return response.json()
+
+    async def create_commit(
+        self,
+        full_name: str,
+        message: str,
+        tree_sha: str,
+        parents: List[str]
+    ) -> Dict[str, Any]:
+        response = await self._request("POST", f"/repos/{full_name}/git/commits", json={
+            "message": message,
+            "tree": tree_sha,
+            "parents": parents
+        }, retry_transient=True)
+        return response.json()
+
+    async def get_commit(self, full_name: str, sha: str) -> Dict[str, Any]:
+        response = await self._request("GET", f"/repos/{full_name}/git/commits/{sha}")
+        return response.json()
+
+    async def get_tree(self, full_name: str, sha: str, recursive: bool = False) -> Dict[str, Any]:
+        params = {"recursive": "1"} if recursive else None
+        response = await self._request("GET", f"/repos/{full_name}/git/trees/{sha}", params=params)
+        return response.json()
+
+    async def get_blob(self, full_name: str, sha: str) -> bytes:
+        response = await self._request("GET", f"/repos/{full_name}/git/blobs/{sha}")
+        return base64.b64decode(response.json()["content"])
+
+    async def get_ref(self, full_name: str, ref: str) -> Dict[str, Any]:
+        response = await self._request("GET", f"/repos/{full_name}/git/ref/{ref}")
+        return response.json()
+
+    async def create_ref(self, full_name: str, ref: str, sha: str) -> Dict[str, Any]:
+        response = await self._request("POST", f"/repos/{full_name}/git/refs", json={
+            "ref": f"refs/{ref}",
+            "sha": sha
+        })
+        return response.json()
+
+    async def create_pull_request(
+        self,
+        full_name: str,
+        title: str,
+        head: str,
+        base: str,
+        body: str = ""
+    ) -> Dict[str, Any]:
+        response = await self._request("POST", f"/repos/{full_name}/pulls", json={
+            "title": title,
+            "head": head,
+            "base": base,
+            "body": body
+        })
+        return response.json()
+
+    async def wait_for_ref(self, full_name: str, ref: str, timeout: float = 30.0) -> Dict[str, Any]:
+        """
+        Poll until a ref such as heads/main exists, backing off from 0.25s.
+        Newly created repositories take a moment before the Git Data API sees them.
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.25
+        while True:
+            try:
+                response = await self._request("GET", f"/repos/{full_name}/git/ref/{ref}")
+                return response.json()
+            except GitHubAPIError as e:
+                # 404 until the repository exists, 409 while it is still empty
+                if e.status not in (404, 409) or time.monotonic() + delay > deadline:
+                    raise
+            await asyncio.sleep(delay)
+            self._record_wait(delay)
+            delay = min(delay * 2, 2.0)
+
+    async def update_ref(self, full_name: str, ref: str, sha: str, force: bool = False) -> Dict[str, Any]:
+        response = await self._request("PATCH", f"/repos/{full_name}/git/refs/{ref}", json={
+            "sha": sha,
+            "force": force
+        })
+        return response.json()
+
+
+# Initialize a singleton instance
+github_client = GitHubClient(
+    base_url=settings.GITHUB_API_URL,
+    max_connections=settings.GITHUB_MAX_CONNECTIONS,
+    max_concurrent_requests=settings.GITHUB_MAX_CONCURRENT_REQUESTS,
+    max_retries=settings.GITHUB_MAX_RETRIES,
+    max_rate_limit_wait=settings.GITHUB_MAX_RATE_LIMIT_WAIT,
+    retry_base_delay=settings.GITHUB_RETRY_BASE_DELAY,
+    identity_cache_ttl=settings.GITHUB_IDENTITY_CACHE_TTL,
+    identity_cache_size=settings.GITHUB_IDENTITY_CACHE_SIZE
+)
@@ -0,0 +1,111 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from ..config import get_settings
+from ..models.job import Job, JobStatus
+
+settings = get_settings()
+
+JobFunc = Callable[[Job], Awaitable[Any]]
+
+
+class JobQueue:
+    """
+    In-process queue for long-running work such as repository provisioning.
+    A fixed pool of worker tasks drains the queue, so at most `concurrency`
+    jobs run at once no matter how many are submitted. Finished jobs are kept
+    for `retention_seconds` so clients can poll their status.
+    """
+
+    def __init__(self, concurrency: int = 4, retention_seconds: int = 3600):
+        self.concurrency = concurrency
+        self.retention = timedelta(seconds=retention_seconds)
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        """Spawn the worker pool"""
+        if self._workers:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        """Cancel the worker pool"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, kind: str, user_id: str, func: JobFunc) -> Job:
+        """Queue `func` to run in the background and return its job record"""
+        self._prune()
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        
+        job = Job(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            user_id=user_id,
+            created_at=datetime.utcnow()
+        )
+        self.jobs[job.id] = job
+        self._queue.put_nowait((job, func))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job, func = await self._queue.get()
+            try:
+                await self._run(job, func)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job, func: JobFunc):
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        try:
+            job.result = await func(job)
+            job.status = JobStatus.SUCCEEDED
+        except HTTPException as e:
+            job.error = {"status_code": e.status_code, "detail": e.detail}
+            job.status = JobStatus.FAILED
+        except asyncio.CancelledError:
+            job.error = {"status_code": 503, "detail": "Job was cancelled"}
+            job.status = JobStatus.FAILED
+            raise
+        except Exception as e:
+            print(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+            job.error = {"status_code": 500, "detail": str(e)}
+            job.status = JobStatus.FAILED
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = datetime.utcnow() - self.retention
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+# Initialize a singleton instance
+job_queue = JobQueue(
+    concurrency=settings.JOB_CONCURRENCY,
+    retention_seconds=settings.JOB_RETENTION_SECONDS
+)
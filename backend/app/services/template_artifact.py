@@ -0,0 +1,76 @@
+"""
+Build step that packs a template directory into a single versioned artifact.
+
+    python -m app.services.template_artifact templates/nextjs-supabase
+
+writes templates/nextjs-supabase.tpl, which TemplateService memory-maps in
+place of the loose directory.
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .template_service import (
+    ARTIFACT_FORMAT,
+    ARTIFACT_HEADER,
+    ARTIFACT_MAGIC,
+    TemplateService,
+    placeholder_spans,
+)
+
+
+def build_artifact(template_path: Path, output_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Pack `template_path` into an artifact and return its index"""
+    output_path = output_path or template_path.with_suffix(".tpl")
+    snapshot = TemplateService(template_path, use_artifact=False).reload()
+    
+    entries = []
+    chunks = []
+    offset = 0
+    for file in snapshot.files:
+        raw = file.content if file.is_binary else file.content.encode('utf-8')
+        entries.append({
+            "path": file.path,
+            "offset": offset,
+            "length": len(raw),
+            "blob_sha": file.blob_sha,
+            "is_binary": file.is_binary,
+            "placeholders": [] if file.is_binary else placeholder_spans(file.content)
+        })
+        chunks.append(raw)
+        offset += len(raw)
+    
+    index = {
+        "format": ARTIFACT_FORMAT,
+        "name": template_path.name,
+        "template_version": snapshot.version,
+        "digest": snapshot.digest,
+        "files": entries
+    }
+    index_bytes = json.dumps(index, separators=(",", ":")).encode('utf-8')
+    
+    # Write next to the target and rename so running workers never map a partial file
+    temp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(temp_path, 'wb') as f:
+        f.write(ARTIFACT_HEADER.pack(ARTIFACT_MAGIC, len(index_bytes)))
+        f.write(index_bytes)
+        for chunk in chunks:
+            f.write(chunk)
+    temp_path.replace(output_path)
+    
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack a project template into a versioned artifact")
+    parser.add_argument("template", type=Path, help="Template directory")
+    parser.add_argument("-o", "--output", type=Path, help="Artifact path (default: <template>.tpl)")
+    args = parser.parse_args()
+    
+    index = build_artifact(args.template, args.output)
+    print(f"Packed {len(index['files'])} files from {args.template} as template version {index['template_version']}")
+
+
+if __name__ == "__main__":
+    main()
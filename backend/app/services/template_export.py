@@ -0,0 +1,87 @@
+import io
+import tarfile
+import time
+import zipfile
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple
+
+from .template_service import RenderedFile
+
+
+class _ChunkWriter:
+    """
+    Write-only file object that hands out whatever was written since the last
+    drain. Archive writers see an unseekable stream, so nothing is buffered
+    beyond the file being added.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _file_bytes(file: RenderedFile) -> bytes:
+    return bytes(file.content) if file.is_binary else file.content.encode('utf-8')
+
+
+def iter_zip(files: Iterable[RenderedFile], root: str) -> Iterator[bytes]:
+    """Stream files as a zip archive under `root/`, one file at a time"""
+    writer = _ChunkWriter()
+    date_time = time.localtime()[:6]
+
+    with zipfile.ZipFile(writer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for file in files:
+            info = zipfile.ZipInfo(f"{root}/{file.path}", date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, _file_bytes(file))
+            chunk = writer.drain()
+            if chunk:
+                yield chunk
+
+    # Central directory
+    yield writer.drain()
+
+
+def iter_tar_gz(files: Iterable[RenderedFile], root: str) -> Iterator[bytes]:
+    """Stream files as a gzipped tarball under `root/`, one file at a time"""
+    writer = _ChunkWriter()
+    mtime = int(time.time())
+
+    with tarfile.open(fileobj=writer, mode='w|gz') as archive:
+        for file in files:
+            data = _file_bytes(file)
+            info = tarfile.TarInfo(f"{root}/{file.path}")
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = mtime
+            archive.addfile(info, io.BytesIO(data))
+            chunk = writer.drain()
+            if chunk:
+                yield chunk
+
+    # End-of-archive blocks and gzip trailer
+    yield writer.drain()
+
+
+class ArchiveFormat(NamedTuple):
+    media_type: str
+    extension: str
+    write: Callable[[Iterable[RenderedFile], str], Iterator[bytes]]
+
+
+ARCHIVE_FORMATS: Dict[str, ArchiveFormat] = {
+    "zip": ArchiveFormat("application/zip", "zip", iter_zip),
+    "tar.gz": ArchiveFormat("application/gzip", "tar.gz", iter_tar_gz),
+}
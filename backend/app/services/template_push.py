@@ -0,0 +1,134 @@
+import asyncio
+import base64
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .github_client import GitHubSession
+from .template_service import RenderedFile
+
+# Sends a progress event for the current operation: notify(update_type, data)
+Notify = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+async def push_files(
+    gh: GitHubSession,
+    full_name: str,
+    branch: str,
+    files: Sequence[RenderedFile],
+    notify: Notify,
+    message: str,
+    parents: Iterable[str] = (),
+    base_tree: Optional[str] = None,
+    known_blobs: Iterable[str] = (),
+    force: bool = False,
+    deleted: Iterable[str] = (),
+    uploaded: Optional[Set[str]] = None
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Commit `files` to `branch` as a single commit via the Git Data API.
+    
+    Blobs are content-addressed, so nothing is uploaded for a file whose SHA
+    is in `known_blobs` (already in the target repository) or was uploaded
+    earlier in the same push. Static text files are sent inline in the tree
+    request instead of as separate blob uploads; only rendered and binary
+    files get their own blob requests, which run concurrently.
+    
+    Paths in `deleted` are removed from `base_tree`. Each blob SHA is added
+    to `uploaded` as soon as its upload succeeds, so an interrupted push can
+    be resumed by passing them back as `known_blobs`.
+    
+    Returns the new commit SHA and transfer statistics.
+    """
+    known = set(known_blobs)
+    stats = {
+        "files": len(files),
+        "blobs_uploaded": 0,
+        "bytes_uploaded": 0,
+        "blobs_reused": 0,
+        "files_inlined": 0,
+        "bytes_saved": 0,
+        "requests_saved": 0
+    }
+    
+    tree_elements: List[Dict[str, Any]] = []
+    uploads: Dict[str, RenderedFile] = {}
+    for file in files:
+        element = {"path": file.path, "mode": "100644", "type": "blob"}
+        if file.blob_sha in known or file.blob_sha in uploads:
+            # The target already has (or is about to have) this exact blob
+            element["sha"] = file.blob_sha
+            stats["blobs_reused"] += 1
+            stats["bytes_saved"] += file.size
+            stats["requests_saved"] += 1
+        elif file.is_static and not file.is_binary:
+            element["content"] = file.content
+            stats["files_inlined"] += 1
+            stats["requests_saved"] += 1
+        else:
+            element["sha"] = file.blob_sha
+            uploads[file.blob_sha] = file
+        tree_elements.append(element)
+    
+    for path in deleted:
+        tree_elements.append({"path": path, "mode": "100644", "type": "blob", "sha": None})
+    
+    total = len(uploads)
+    await notify(
+        "upload_started",
+        {"message": "Uploading template files...", "current": 0, "total": total}
+    )
+    
+    async def upload_blob(file: RenderedFile) -> Tuple[RenderedFile, str]:
+        if file.is_binary:
+            blob = await gh.create_blob(full_name, base64.b64encode(file.content).decode('utf-8'), "base64")
+        else:
+            blob = await gh.create_blob(full_name, file.content, "utf-8")
+        # Checkpoint here rather than as results are collected: a failed
+        # upload cancels the collection, not the uploads that succeeded
+        if uploaded is not None:
+            uploaded.add(blob["sha"])
+        return file, blob["sha"]
+    
+    tasks = [asyncio.ensure_future(upload_blob(file)) for file in uploads.values()]
+    
+    uploaded_count = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            file, sha = await next_done
+            uploaded_count += 1
+            stats["blobs_uploaded"] += 1
+            stats["bytes_uploaded"] += file.size
+            
+            if sha != file.blob_sha:
+                # Should not happen, but trust GitHub over our own hashing
+                print(f"Warning: blob SHA mismatch for {file.path}: expected {file.blob_sha}, got {sha}")
+                for element in tree_elements:
+                    if element.get("sha") == file.blob_sha:
+                        element["sha"] = sha
+            
+            # Send progress update
+            if uploaded_count % 5 == 0 or uploaded_count == total:
+                await notify(
+                    "upload_progress",
+                    {
+                        "current": uploaded_count,
+                        "total": total,
+                        "percentage": round((uploaded_count / total) * 100),
+                        "current_file": file.path,
+                        "wait_seconds": round(gh.wait_seconds, 2)
+                    }
+                )
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    
+    await notify(
+        "creating_commit",
+        {"message": f"Creating commit with {len(files)} files..."}
+    )
+    
+    tree = await gh.create_tree(full_name, tree_elements, base_tree=base_tree)
+    commit = await gh.create_commit(full_name, message, tree["sha"], list(parents))
+    await gh.update_ref(full_name, f"heads/{branch}", commit["sha"], force=force)
+    
+    return commit["sha"], stats
@@ -0,0 +1,289 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..cache import TTLCache
+from ..config import get_settings
+from .template_service import TEMPLATES_PATH, LayeredTemplate, TemplateService
+
+settings = get_settings()
+
+
+def _accepts(values: frozenset, value: Any) -> bool:
+    """Whether a match rule allows a tech_stack value; lists and objects never match"""
+    if value is None:
+        return True
+    return isinstance(value, (str, int, float, bool)) and value in values
+
+
+class TemplateSpec(NamedTuple):
+    """A registered template; nothing is read from disk until it is used"""
+    name: str
+    version: Optional[str]
+    path: Optional[Path]
+    artifact_path: Optional[Path]
+    # tech_stack key -> accepted values
+    match: Dict[str, frozenset]
+
+
+class LayerSpec(NamedTuple):
+    """An overlay applied over any template when `when(tech_stack, integrations)` holds"""
+    name: str
+    path: Path
+    when: Callable[[Dict[str, Any], Dict[str, Any]], bool]
+
+
+class TemplateRegistry:
+    """
+    Registry of project templates and their versions.
+    Templates are loaded and compiled on first use and kept in an LRU bounded
+    by the memory their contents take, so registering more stacks costs
+    nothing until they are actually requested.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_compositions: int = 32,
+        max_rendered_files: int = 4096
+    ):
+        self.max_bytes = max_bytes
+        self.max_compositions = max_compositions
+        # Shared by every template, layer and composition
+        self.render_cache = TTLCache(maxsize=max_rendered_files, ttl=float("inf"))
+        self.default_name: Optional[str] = None
+        self._specs: Dict[Tuple[str, Optional[str]], TemplateSpec] = {}
+        self._loaded: "OrderedDict[Tuple[str, Optional[str]], TemplateService]" = OrderedDict()
+        self._layer_specs: Dict[str, LayerSpec] = {}
+        self._layers: Dict[str, TemplateService] = {}
+        # (name, version, layers) -> composed template
+        self._composed: "OrderedDict[Tuple[str, Optional[str], Tuple[str, ...]], LayeredTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        path: Optional[Path] = None,
+        artifact_path: Optional[Path] = None,
+        version: Optional[str] = None,
+        match: Optional[Dict[str, Iterable[str]]] = None,
+        default: bool = False
+    ):
+        """
+        Register a template directory or artifact under `name`.
+        `version` labels an older release kept alongside the current one
+        (None); `match` maps tech_stack keys to the values this template serves.
+        """
+        if path is None and artifact_path is None:
+            raise ValueError("A template needs a directory or an artifact")
+        
+        spec = TemplateSpec(
+            name,
+            version,
+            path,
+            artifact_path,
+            {key: frozenset(values) for key, values in (match or {}).items()}
+        )
+        with self._lock:
+            self._specs[(name, version)] = spec
+            self._loaded.pop((name, version), None)
+            self._drop_compositions(lambda key: key[:2] == (name, version))
+        if default or self.default_name is None:
+            self.default_name = name
+
+    def register_layer(
+        self,
+        name: str,
+        path: Path,
+        when: Callable[[Dict[str, Any], Dict[str, Any]], bool]
+    ):
+        """
+        Register an overlay directory. Layers apply in registration order, so
+        a later layer wins when two of them write the same file.
+        """
+        with self._lock:
+            self._layer_specs[name] = LayerSpec(name, path, when)
+            self._layers.pop(name, None)
+            self._drop_compositions(lambda key: name in key[2])
+
+    def layers_for(
+        self,
+        tech_stack: Optional[Dict[str, Any]],
+        integrations: Optional[Dict[str, Any]]
+    ) -> Tuple[str, ...]:
+        """Names of the layers a project with this configuration gets, in order"""
+        tech_stack = tech_stack or {}
+        integrations = integrations or {}
+        return tuple(
+            spec.name for spec in self._layer_specs.values()
+            if spec.when(tech_stack, integrations)
+        )
+
+    def get(
+        self,
+        name: str,
+        version: Optional[str] = None,
+        layers: Sequence[str] = ()
+    ) -> TemplateService:
+        """
+        Get a template, creating its service on first use.
+        With `layers`, get the composition of the template and those overlays,
+        memoized per combination.
+        """
+        if layers:
+            return self._compose(name, version, tuple(layers))
+        
+        key = (name, version)
+        with self._lock:
+            service = self._loaded.get(key)
+            if service is not None:
+                self._loaded.move_to_end(key)
+                return service
+            
+            spec = self._specs.get(key)
+            if spec is None:
+                raise KeyError(f"Unknown template: {name}" + (f"@{version}" if version else ""))
+            
+            service = TemplateService(
+                spec.path,
+                artifact_path=spec.artifact_path,
+                name=spec.name,
+                render_cache=self.render_cache
+            )
+            self._loaded[key] = service
+            return service
+
+    def _compose(self, name: str, version: Optional[str], layers: Tuple[str, ...]) -> LayeredTemplate:
+        key = (name, version, layers)
+        with self._lock:
+            composed = self._composed.get(key)
+            if composed is not None:
+                self._composed.move_to_end(key)
+                return composed
+        
+        base = self.get(name, version)
+        with self._lock:
+            parts = []
+            for layer in layers:
+                spec = self._layer_specs.get(layer)
+                if spec is None:
+                    raise KeyError(f"Unknown template layer: {layer}")
+                service = self._layers.get(layer)
+                if service is None:
+                    service = TemplateService(spec.path, use_artifact=False, name=layer)
+                    self._layers[layer] = service
+                parts.append((layer, service))
+            
+            composed = self._composed.setdefault(key, LayeredTemplate(base, parts))
+            self._composed.move_to_end(key)
+            while len(self._composed) > self.max_compositions:
+                self._composed.popitem(last=False)
+            return composed
+
+    async def load(
+        self,
+        name: str,
+        version: Optional[str] = None,
+        layers: Sequence[str] = ()
+    ) -> TemplateService:
+        """Get a template with its snapshot loaded off the event loop"""
+        service = self.get(name, version, layers)
+        await service.ensure_loaded()
+        with self._lock:
+            self._evict()
+        return service
+
+    def select(self, tech_stack: Optional[Dict[str, Any]]) -> str:
+        """
+        Name the current template whose match rules accept `tech_stack`.
+        Keys a template does not constrain are ignored; no tech stack means
+        the default template.
+        """
+        if not tech_stack:
+            return self.default_name
+        
+        for spec in self._current_specs():
+            if all(
+                _accepts(values, tech_stack.get(key))
+                for key, values in spec.match.items()
+            ):
+                return spec.name
+        
+        raise LookupError(f"No template supports this tech stack: {tech_stack}")
+
+    def names(self) -> List[str]:
+        return [spec.name for spec in self._current_specs()]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = {
+                f"{name}@{version}" if version else name: service.snapshot.size
+                for (name, version), service in self._loaded.items()
+                if service.is_loaded
+            }
+            layers = sorted(name for name, service in self._layers.items() if service.is_loaded)
+            compositions = ["+".join((name, *layers_)) for name, _, layers_ in self._composed]
+        return {
+            "registered": len(self._specs),
+            "loaded": loaded,
+            "layers": layers,
+            "compositions": compositions,
+            "render_cache": self.render_cache.stats(),
+            "bytes": sum(loaded.values()),
+            "max_bytes": self.max_bytes
+        }
+
+    def _current_specs(self) -> List[TemplateSpec]:
+        return [spec for spec in self._specs.values() if spec.version is None]
+
+    def _evict(self):
+        """Drop least recently used templates until loaded contents fit in max_bytes"""
+        total = sum(s.snapshot.size for s in self._loaded.values() if s.is_loaded)
+        while total > self.max_bytes and len(self._loaded) > 1:
+            key, service = self._loaded.popitem(last=False)
+            if service.is_loaded:
+                total -= service.snapshot.size
+            # Compositions hold on to their base template
+            self._drop_compositions(lambda composed: composed[:2] == key)
+
+    def _drop_compositions(self, predicate: Callable[[Tuple[str, Optional[str], Tuple[str, ...]]], bool]):
+        for key in [key for key in self._composed if predicate(key)]:
+            del self._composed[key]
+
+
+# Initialize a singleton instance with the bundled templates
+template_registry = TemplateRegistry(
+    max_bytes=settings.TEMPLATE_CACHE_MAX_BYTES,
+    max_compositions=settings.TEMPLATE_COMPOSITION_CACHE_SIZE,
+    max_rendered_files=settings.TEMPLATE_RENDER_CACHE_SIZE
+)
+template_registry.register(
+    "nextjs-supabase",
+    TEMPLATES_PATH / "nextjs-supabase",
+    match={"frontend": ["nextjs15", "nextjs"]},
+    default=True
+)
+template_registry.register_layer(
+    "auth-google",
+    TEMPLATES_PATH / "overlays" / "auth-google",
+    lambda tech_stack, integrations: (
+        integrations.get("supabaseAuth", True)
+        and "google" in (integrations.get("supabaseAuthProviders") or [])
+    )
+)
+template_registry.register_layer(
+    "stripe",
+    TEMPLATES_PATH / "overlays" / "stripe",
+    lambda tech_stack, integrations: bool(integrations.get("stripe"))
+)
+template_registry.register_layer(
+    "docker",
+    TEMPLATES_PATH / "overlays" / "docker",
+    lambda tech_stack, integrations: bool(tech_stack.get("docker"))
+)
+template_registry.register_layer(
+    "vercel",
+    TEMPLATES_PATH / "overlays" / "vercel",
+    lambda tech_stack, integrations: bool(integrations.get("vercel"))
+)
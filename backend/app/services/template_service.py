@@ -1,67 +1,393 @@
 import os
+import re
 import json
-from typing import Dict, List, Tuple, Any
+import mmap
+import struct
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Any, Union
 from pathlib import Path
 
+from ..cache import TTLCache
+
+
+# Prebuilt template artifact (see template_artifact.py): header with magic and
+# index length, a JSON index, then every file's bytes back to back
+ARTIFACT_MAGIC = b"5AMTPL\x00\x01"
+ARTIFACT_HEADER = struct.Struct("<8sI")
+ARTIFACT_FORMAT = 1
+
+# Root of the bundled templates
+TEMPLATES_PATH = Path(__file__).parent.parent.parent / "templates"
+
+# Directories never copied into a project
+SKIP_DIRS = frozenset({'node_modules', '.git'})
+
+# Overlay files ending in this suffix extend the file below them instead of
+# replacing it, e.g. README.md.append
+APPEND_SUFFIX = ".append"
+
+# {{VARIABLE}} placeholders in text files
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Za-z0-9_]+)\}\}")
+
+# Variables prepare_template_files provides
+TEMPLATE_VARIABLES = frozenset({
+    "PROJECT_NAME",
+    "PROJECT_DESCRIPTION",
+    "GITHUB_USERNAME",
+    "GITHUB_REPO_URL",
+    "SUPABASE_URL",
+    "SUPABASE_ANON_KEY",
+    "SUPABASE_SERVICE_ROLE_KEY",
+    "SUPABASE_PROJECT_ID",
+})
+
+
+class CompiledTemplate(NamedTuple):
+    """
+    Text split once into literal chunks and variable slots.
+    Literals sit at even indexes of `segments` and variable names at odd ones,
+    so rendering is a single join with no scanning.
+    """
+    segments: Tuple[str, ...]
+    placeholders: FrozenSet[str]
+
+    def render(self, variables: Dict[str, str]) -> str:
+        if not self.placeholders:
+            return self.segments[0]
+        
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            value = variables.get(parts[i])
+            # Unknown placeholders are left as they are
+            parts[i] = value if value is not None else f"{{{{{parts[i]}}}}}"
+        return "".join(parts)
+
+
+def is_binary_content(raw: bytes) -> bool:
+    """Treat content as binary if it has NUL bytes or is not valid UTF-8"""
+    if b"\0" in raw[:8192]:
+        return True
+    try:
+        raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def git_blob_sha(data: bytes) -> str:
+    """The SHA git and GitHub assign to a blob with this content"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def compile_template(content: str) -> CompiledTemplate:
+    """Compile text into a CompiledTemplate"""
+    segments = tuple(PLACEHOLDER_PATTERN.split(content))
+    return CompiledTemplate(segments, frozenset(segments[1::2]))
+
+
+def concat_compiled(first: CompiledTemplate, second: CompiledTemplate) -> CompiledTemplate:
+    """Join two compiled templates without recompiling either"""
+    segments = first.segments[:-1] + (first.segments[-1] + second.segments[0],) + second.segments[1:]
+    return CompiledTemplate(segments, first.placeholders | second.placeholders)
+
+
+def placeholder_spans(content: str) -> List[Tuple[int, int, str]]:
+    """(start, end, name) of every placeholder, as stored in artifact indexes"""
+    return [(m.start(), m.end(), m.group(1)) for m in PLACEHOLDER_PATTERN.finditer(content)]
+
+
+def compile_from_spans(content: str, spans: List[Tuple[int, int, str]]) -> CompiledTemplate:
+    """Build a CompiledTemplate from precomputed placeholder spans without a regex pass"""
+    segments = []
+    position = 0
+    for start, end, name in spans:
+        segments.append(content[position:start])
+        segments.append(name)
+        position = end
+    segments.append(content[position:])
+    return CompiledTemplate(tuple(segments), frozenset(name for _, _, name in spans))
+
+
+class TemplateFile(NamedTuple):
+    path: str
+    # Binary files loaded from an artifact are zero-copy memoryviews
+    content: Union[str, bytes, memoryview]
+    is_binary: bool
+    # Git blob SHA of the file as stored in the template
+    blob_sha: str
+    # None for binary files
+    compiled: Optional[CompiledTemplate] = None
+
+
+class RenderedFile(NamedTuple):
+    """A template file rendered for one project"""
+    path: str
+    content: Union[str, bytes, memoryview]
+    is_binary: bool
+    # Git blob SHA of the rendered content
+    blob_sha: str
+    # Size of the rendered content in bytes
+    size: int
+    # True when the content is the same for every project
+    is_static: bool
+
+
+class TemplateSnapshot(NamedTuple):
+    """Immutable in-memory copy of a template directory"""
+    files: Tuple[TemplateFile, ...]
+    # (relative_path, mtime_ns, size) per file, used to detect changes on disk
+    fingerprint: Tuple[Tuple[str, int, int], ...]
+    # SHA-256 over every path and content
+    digest: str
+    # Placeholders per file that prepare_template_files does not provide
+    unknown_placeholders: Dict[str, FrozenSet[str]]
+
+    @property
+    def version(self) -> str:
+        """Exact template version recorded on projects"""
+        return self.digest[:12]
+
+    @property
+    def size(self) -> int:
+        """Approximate memory held by file contents"""
+        return sum(len(f.content) for f in self.files)
+
+
+def read_artifact(path: Path, fingerprint: Tuple[Tuple[str, int, int], ...]) -> TemplateSnapshot:
+    """
+    Memory-map a prebuilt template artifact.
+    Files are sliced straight out of the mapping, so processes loading the
+    same artifact share its pages; only text files are decoded.
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    magic, index_length = ARTIFACT_HEADER.unpack_from(mapped, 0)
+    if magic != ARTIFACT_MAGIC:
+        raise ValueError(f"{path} is not a template artifact")
+    
+    index_start = ARTIFACT_HEADER.size
+    index = json.loads(mapped[index_start:index_start + index_length])
+    if index.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"{path} has unsupported artifact format {index.get('format')}")
+    
+    data = memoryview(mapped)[index_start + index_length:]
+    files = []
+    unknown_placeholders = {}
+    for entry in index["files"]:
+        content = data[entry["offset"]:entry["offset"] + entry["length"]]
+        compiled = None
+        if not entry["is_binary"]:
+            content = str(content, 'utf-8')
+            compiled = compile_from_spans(content, entry["placeholders"])
+            unknown = compiled.placeholders - TEMPLATE_VARIABLES
+            if unknown:
+                unknown_placeholders[entry["path"]] = unknown
+        files.append(TemplateFile(entry["path"], content, entry["is_binary"], entry["blob_sha"], compiled))
+    
+    return TemplateSnapshot(tuple(files), fingerprint, index["digest"], unknown_placeholders)
+
+
+def compose_snapshots(base: TemplateSnapshot, layers: Sequence[Tuple[str, TemplateSnapshot]]) -> TemplateSnapshot:
+    """
+    Apply overlay snapshots over a base snapshot in order.
+    A layer file replaces the file at the same path, or extends it when named
+    with APPEND_SUFFIX. Files are reused as compiled, so composing is a
+    dictionary merge and never re-reads or re-parses a layer.
+    """
+    files = {f.path: f for f in base.files}
+    fingerprint = list(base.fingerprint)
+    digest = hashlib.sha256(base.digest.encode('utf-8'))
+    
+    for name, layer in layers:
+        fingerprint.extend((f"{name}:{path}", mtime, size) for path, mtime, size in layer.fingerprint)
+        digest.update(b"\0" + name.encode('utf-8') + b"\0" + layer.digest.encode('utf-8'))
+        
+        for f in layer.files:
+            if f.path.endswith(APPEND_SUFFIX):
+                path = f.path[:-len(APPEND_SUFFIX)]
+                below = files.get(path)
+                if below is None:
+                    f = f._replace(path=path)
+                elif below.is_binary or f.is_binary:
+                    raise ValueError(f"Overlay {name} cannot append to binary file {path}")
+                else:
+                    content = below.content + f.content
+                    compiled = concat_compiled(below.compiled, f.compiled)
+                    f = TemplateFile(path, content, False, git_blob_sha(content.encode('utf-8')), compiled)
+            files[f.path] = f
+    
+    unknown_placeholders = {}
+    for f in files.values():
+        if f.compiled is not None:
+            unknown = f.compiled.placeholders - TEMPLATE_VARIABLES
+            if unknown:
+                unknown_placeholders[f.path] = unknown
+    
+    return TemplateSnapshot(tuple(files.values()), tuple(fingerprint), digest.hexdigest(), unknown_placeholders)
+
 
 class TemplateService:
     """Service for handling template file operations"""
     
-    def __init__(self):
-        self.template_base_path = Path(__file__).parent.parent.parent / "templates" / "nextjs-supabase"
+    def __init__(
+        self,
+        template_path: Optional[Path] = None,
+        check_interval: float = 5.0,
+        use_artifact: bool = True,
+        artifact_path: Optional[Path] = None,
+        name: Optional[str] = None,
+        render_cache: Optional[TTLCache] = None
+    ):
+        self.template_base_path = template_path or TEMPLATES_PATH / "nextjs-supabase"
+        # A prebuilt artifact next to the template directory is loaded instead
+        # while it is newer than every file in it
+        if artifact_path is not None:
+            self.artifact_path = artifact_path
+        else:
+            self.artifact_path = self.template_base_path.with_suffix(".tpl") if use_artifact else None
+        self.name = name or self.template_base_path.name
+        self.check_interval = check_interval
+        # Rendered files keyed by source blob SHA and the values of only the
+        # variables that file uses; may be shared between services
+        self.render_cache = render_cache if render_cache is not None else TTLCache(maxsize=4096, ttl=float("inf"))
+        self._snapshot: Optional[TemplateSnapshot] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        # Whether the last scan chose the artifact over the directory
+        self._artifact_current = False
+        self._warned_stale = False
     
-    def get_all_template_files(self) -> List[Tuple[str, str, bool]]:
+    def _scan(self) -> Tuple[Tuple[str, int, int], ...]:
         """
-        Get all template files with their relative paths and content.
-        Returns: List of tuples (relative_path, content, is_binary)
+        Stat every template file without reading it. A prebuilt artifact is
+        used instead only while it is at least as new as the directory, so
+        edits made after the last build are not silently ignored.
         """
-        files = []
-        
+        entries = []
+        newest = 0
         for root, dirs, filenames in os.walk(self.template_base_path):
             # Skip node_modules and .git directories
-            dirs[:] = [d for d in dirs if d not in ['node_modules', '.git']]
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            # A directory's mtime changes when files are added or removed
+            newest = max(newest, os.stat(root).st_mtime_ns)
             
-            for filename in filenames:
+            for filename in sorted(filenames):
                 file_path = Path(root) / filename
-                relative_path = str(file_path.relative_to(self.template_base_path))
-                
-                # Determine if file is binary
-                binary_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.ico', '.woff', '.woff2', '.ttf'}
-                is_binary = any(filename.endswith(ext) for ext in binary_extensions)
-                
-                try:
-                    if is_binary:
-                        with open(file_path, 'rb') as f:
-                            content = f.read()
-                    else:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                    
-                    files.append((relative_path, content, is_binary))
-                except Exception as e:
-                    print(f"Error reading file {relative_path}: {e}")
-                    continue
+                stat = file_path.stat()
+                newest = max(newest, stat.st_mtime_ns)
+                entries.append((
+                    file_path.relative_to(self.template_base_path).as_posix(),
+                    stat.st_mtime_ns,
+                    stat.st_size
+                ))
+        
+        self._artifact_current = False
+        if self.artifact_path is not None and self.artifact_path.exists():
+            stat = self.artifact_path.stat()
+            if stat.st_mtime_ns >= newest:
+                self._artifact_current = True
+                return ((self.artifact_path.name, stat.st_mtime_ns, stat.st_size),)
+            if not self._warned_stale:
+                print(
+                    f"Warning: {self.template_base_path} changed after {self.artifact_path.name} was built; "
+                    "loading the directory instead. Rebuild the artifact with `make template`."
+                )
+                self._warned_stale = True
+        return tuple(entries)
+    
+    def _load(self, fingerprint: Tuple[Tuple[str, int, int], ...]) -> TemplateSnapshot:
+        """Read every template file into a new snapshot"""
+        if self._artifact_current:
+            return read_artifact(self.artifact_path, fingerprint)
+        
+        files = []
+        digest = hashlib.sha256()
+        unknown_placeholders = {}
         
-        return files
+        for relative_path, _, _ in fingerprint:
+            file_path = self.template_base_path / relative_path
+            
+            try:
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+            except Exception as e:
+                print(f"Error reading file {relative_path}: {e}")
+                continue
+            
+            is_binary = is_binary_content(raw)
+            content = raw if is_binary else raw.decode('utf-8')
+            
+            compiled = None
+            if not is_binary:
+                compiled = compile_template(content)
+                unknown = compiled.placeholders - TEMPLATE_VARIABLES
+                if unknown:
+                    unknown_placeholders[relative_path] = unknown
+                    print(f"Warning: unknown placeholders in {relative_path}: {', '.join(sorted(unknown))}")
+            
+            files.append(TemplateFile(relative_path, content, is_binary, git_blob_sha(raw), compiled))
+            digest.update(relative_path.encode('utf-8') + b"\0" + raw + b"\0")
+        
+        return TemplateSnapshot(tuple(files), fingerprint, digest.hexdigest(), unknown_placeholders)
+    
+    def reload(self) -> TemplateSnapshot:
+        """Re-read the template from disk unconditionally"""
+        with self._lock:
+            self._snapshot = self._load(self._scan())
+            self._last_check = time.monotonic()
+            return self._snapshot
+    
+    def refresh(self) -> TemplateSnapshot:
+        """
+        Load the template if needed, and reload it when files changed on disk.
+        Disk is checked at most once per `check_interval` seconds.
+        """
+        if self._snapshot is not None and time.monotonic() - self._last_check < self.check_interval:
+            return self._snapshot
+        
+        with self._lock:
+            fingerprint = self._scan()
+            if self._snapshot is None or fingerprint != self._snapshot.fingerprint:
+                self._snapshot = self._load(fingerprint)
+            self._last_check = time.monotonic()
+            return self._snapshot
+    
+    async def ensure_loaded(self) -> TemplateSnapshot:
+        """Refresh the snapshot in a worker thread so file I/O stays off the event loop"""
+        return await asyncio.to_thread(self.refresh)
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+    
+    @property
+    def snapshot(self) -> TemplateSnapshot:
+        """The current snapshot, loading it on first use"""
+        if self._snapshot is None:
+            return self.refresh()
+        return self._snapshot
+    
+    def get_all_template_files(self) -> List[Tuple[str, Any, bool]]:
+        """
+        Get all template files with their relative paths and content.
+        Returns: List of tuples (relative_path, content, is_binary)
+        """
+        return [(f.path, f.content, f.is_binary) for f in self.snapshot.files]
     
     def replace_template_variables(self, content: str, variables: Dict[str, str]) -> str:
         """Replace template variables in content"""
         if isinstance(content, bytes):
             return content
-            
-        for key, value in variables.items():
-            placeholder = f"{{{{{key}}}}}"
-            content = content.replace(placeholder, value)
         
-        return content
+        return compile_template(content).render(variables)
     
-    def prepare_template_files(self, project_config: Dict[str, Any]) -> List[Tuple[str, Any, bool]]:
-        """
-        Prepare all template files with variables replaced.
-        Returns: List of tuples (path, content, is_binary)
-        """
-        # Define template variables
-        variables = {
+    def build_variables(self, project_config: Dict[str, Any]) -> Dict[str, str]:
+        """Map a project configuration to template variables"""
+        return {
             "PROJECT_NAME": project_config.get("name", "my-app"),
             "PROJECT_DESCRIPTION": project_config.get("description", "A Next.js app with Supabase"),
             "GITHUB_USERNAME": project_config.get("github_username", ""),
@@ -71,25 +397,46 @@ class TemplateService:
             "SUPABASE_SERVICE_ROLE_KEY": project_config.get("supabase_service_key", "your_supabase_service_key"),
             "SUPABASE_PROJECT_ID": project_config.get("supabase_project_id", "your_project_id"),
         }
+    
+    def prepare_template_files(self, project_config: Dict[str, Any]) -> List[RenderedFile]:
+        """
+        Prepare all template files with variables replaced.
+        Returns: List of RenderedFile
+        """
+        return list(self.iter_template_files(project_config))
+    
+    def iter_template_files(self, project_config: Dict[str, Any]) -> Iterator[RenderedFile]:
+        """
+        Render template files one at a time, for consumers that stream them.
+        Files without placeholders keep the blob SHA computed at load time.
+        Other files are rendered and hashed once per combination of the
+        variables they use, so a file using only PROJECT_NAME is rendered once
+        per name however the rest of the configuration varies.
+        """
+        variables = self.build_variables(project_config)
         
-        # Get all template files
-        template_files = self.get_all_template_files()
-        
-        # Process each file
-        processed_files = []
-        for relative_path, content, is_binary in template_files:
+        # Render each file from the in-memory snapshot; no disk access here
+        for relative_path, content, is_binary, blob_sha, compiled in self.snapshot.files:
             # Special handling for .env.local.template
             if relative_path == ".env.local.template":
                 # Rename to .env.local
                 relative_path = ".env.local"
             
-            # Replace variables in non-binary files
-            if not is_binary:
-                content = self.replace_template_variables(content, variables)
+            is_static = compiled is None or not compiled.placeholders
+            if is_static:
+                size = len(content) if is_binary else len(content.encode('utf-8'))
+            else:
+                key = (blob_sha, tuple((name, variables.get(name)) for name in sorted(compiled.placeholders)))
+                rendered = self.render_cache.get(key)
+                if rendered is None:
+                    # Replace variables in non-binary files
+                    content = compiled.render(variables)
+                    raw = content.encode('utf-8')
+                    rendered = (content, git_blob_sha(raw), len(raw))
+                    self.render_cache.set(key, rendered)
+                content, blob_sha, size = rendered
             
-            processed_files.append((relative_path, content, is_binary))
-        
-        return processed_files
+            yield RenderedFile(relative_path, content, is_binary, blob_sha, size, is_static)
     
     def get_file_tree_structure(self) -> str:
         """Generate a tree structure of the template for documentation"""
@@ -118,5 +465,44 @@ class TemplateService:
         return "\n".join(tree_lines)
 
 
-# Initialize a singleton instance
-template_service = TemplateService()
\ No newline at end of file
+class LayeredTemplate(TemplateService):
+    """
+    A base template with overlay layers applied on top.
+    Each part stays its own TemplateService, loaded and compiled once and
+    shared by every combination that uses it; the composed snapshot is rebuilt
+    only when one of the parts reloads.
+    """
+    
+    def __init__(self, base: TemplateService, layers: Sequence[Tuple[str, TemplateService]]):
+        super().__init__(
+            base.template_base_path,
+            use_artifact=False,
+            name="+".join([base.name, *(name for name, _ in layers)]),
+            render_cache=base.render_cache
+        )
+        self.base = base
+        self.layers = tuple(layers)
+        # Part snapshots the current composition was built from
+        self._sources: Tuple[TemplateSnapshot, ...] = ()
+    
+    def reload(self) -> TemplateSnapshot:
+        """Re-read the base and every layer from disk unconditionally"""
+        self.base.reload()
+        for _, service in self.layers:
+            service.reload()
+        return self.refresh()
+    
+    def refresh(self) -> TemplateSnapshot:
+        """Refresh every part and recompose when any of them changed"""
+        base = self.base.refresh()
+        layers = tuple(service.refresh() for _, service in self.layers)
+        sources = (base, *layers)
+        
+        with self._lock:
+            if self._snapshot is None or any(a is not b for a, b in zip(sources, self._sources)):
+                self._snapshot = compose_snapshots(
+                    base,
+                    [(name, snapshot) for (name, _), snapshot in zip(self.layers, layers)]
+                )
+                self._sources = sources
+            return self._snapshot
@@ -0,0 +1,209 @@
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .github_client import GitHubAPIError, GitHubSession
+from .template_push import Notify, push_files
+from .template_registry import template_registry
+from .template_service import RenderedFile, TemplateService, git_blob_sha
+
+# Committed into every generated repository: the template version and the
+# blob SHA of each file as the template rendered it. Upgrades diff against it
+# to tell template changes from the user's own edits.
+MANIFEST_PATH = ".5am/template.json"
+
+UPGRADE_MODES = ("commit", "pull_request")
+
+
+class UpgradePlan(NamedTuple):
+    # Rendered files to write
+    changed: List[RenderedFile]
+    # Paths the template dropped and the user never touched
+    deleted: List[str]
+    # Paths both the template and the user changed; left as the user has them
+    conflicts: List[str]
+    unchanged: int
+
+
+def manifest_file(template_version: str, files: Sequence[RenderedFile]) -> RenderedFile:
+    """The manifest to commit alongside `files`"""
+    content = json.dumps(
+        {
+            "template": template_version,
+            "files": {f.path: f.blob_sha for f in sorted(files, key=lambda f: f.path)}
+        },
+        indent=2
+    ) + "\n"
+    raw = content.encode('utf-8')
+    return RenderedFile(MANIFEST_PATH, content, False, git_blob_sha(raw), len(raw), False)
+
+
+def parse_template_version(template_version: str) -> Tuple[str, Tuple[str, ...], Optional[str]]:
+    """Split "name+layer+layer@version" into (name, layers, version)"""
+    spec, _, version = template_version.partition("@")
+    name, *layers = spec.split("+")
+    return name, tuple(layers), version or None
+
+
+def plan_upgrade(
+    files: Sequence[RenderedFile],
+    repo_tree: Dict[str, str],
+    manifest: Optional[Dict[str, str]]
+) -> UpgradePlan:
+    """
+    Three-way compare at blob-SHA level between what the template rendered
+    last time (`manifest`), what the repository has now (`repo_tree`) and
+    what it renders now (`files`). A file is only overwritten when the
+    repository still has the previously rendered content. Without a manifest
+    nothing that exists is overwritten, and only missing files are added.
+    """
+    changed, conflicts = [], []
+    unchanged = 0
+    previous = manifest or {}
+
+    for file in files:
+        current = repo_tree.get(file.path)
+        base = previous.get(file.path)
+        if current == file.blob_sha or base == file.blob_sha:
+            # Up to date, or only the user changed it
+            unchanged += 1
+        elif current is None and base is None:
+            changed.append(file)
+        elif current is not None and current == base:
+            changed.append(file)
+        else:
+            conflicts.append(file.path)
+
+    rendered = {f.path for f in files}
+    deleted = []
+    for path, base in previous.items():
+        if path in rendered or path not in repo_tree:
+            continue
+        if repo_tree[path] == base:
+            deleted.append(path)
+        else:
+            conflicts.append(path)
+
+    return UpgradePlan(changed, deleted, conflicts, unchanged)
+
+
+async def load_recorded_template(recorded_version: Optional[str]) -> TemplateService:
+    """
+    The template a repository was generated from. Projects created before
+    templates were named recorded a bare version such as "1.0.0", and a
+    template or layer may have been unregistered since; both get the default
+    template.
+    """
+    if recorded_version:
+        name, layers, _ = parse_template_version(recorded_version)
+        try:
+            return await template_registry.load(name, layers=layers)
+        except KeyError:
+            pass
+    return await template_registry.load(template_registry.default_name)
+
+
+async def upgrade_repository(
+    gh: GitHubSession,
+    repo: Dict[str, Any],
+    github_username: str,
+    notify: Notify,
+    mode: str = "commit",
+    recorded_version: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Bring a generated repository up to the current version of its template
+    as one commit on the default branch, or on a branch with a pull request.
+
+    Only files that differ are uploaded, so the cost follows the size of the
+    diff; a project already on the current version costs the reads needed
+    to find its manifest and nothing more.
+    """
+    full_name = repo["full_name"]
+    branch = repo.get("default_branch") or "main"
+
+    head = (await gh.get_ref(full_name, f"heads/{branch}"))["object"]["sha"]
+    base_tree = (await gh.get_commit(full_name, head))["tree"]["sha"]
+    tree = await gh.get_tree(full_name, base_tree, recursive=True)
+    repo_tree = {
+        entry["path"]: entry["sha"]
+        for entry in tree["tree"]
+        if entry["type"] == "blob"
+    }
+
+    # The manifest in the repository is authoritative for what was generated
+    manifest = None
+    if MANIFEST_PATH in repo_tree:
+        manifest = json.loads(await gh.get_blob(full_name, repo_tree[MANIFEST_PATH]))
+        recorded_version = manifest["template"]
+
+    template = await load_recorded_template(recorded_version)
+    template_version = f"{template.name}@{template.snapshot.version}"
+    if manifest is not None and manifest["template"] == template_version:
+        return {"status": "up_to_date", "template_version": template_version}
+
+    files = template.prepare_template_files({
+        "name": repo["name"],
+        "description": repo.get("description") or "A new SaaS project created with 5AM Founder",
+        "github_username": github_username,
+        "repo_url": repo["html_url"]
+    })
+    plan = plan_upgrade(files, repo_tree, manifest["files"] if manifest else None)
+    result = {
+        "template_version": template_version,
+        "previous_version": recorded_version,
+        "changed": [f.path for f in plan.changed],
+        "deleted": plan.deleted,
+        "conflicts": plan.conflicts,
+        "unchanged": plan.unchanged
+    }
+    if not plan.changed and not plan.deleted:
+        return {"status": "up_to_date", **result}
+
+    await notify(
+        "upgrade_started",
+        {
+            "repository": full_name,
+            "changed": len(plan.changed),
+            "deleted": len(plan.deleted),
+            "conflicts": len(plan.conflicts)
+        }
+    )
+
+    message = f"Upgrade template to {template_version}"
+    target = branch
+    if mode == "pull_request":
+        target = f"5am-template-upgrade-{template.snapshot.version}"
+        try:
+            await gh.create_ref(full_name, f"heads/{target}", head)
+        except GitHubAPIError as e:
+            # Branch left over from an earlier attempt; start it over
+            if e.status != 422:
+                raise
+            await gh.update_ref(full_name, f"heads/{target}", head, force=True)
+
+    commit_sha, transfer = await push_files(
+        gh,
+        full_name,
+        target,
+        plan.changed + [manifest_file(template_version, files)],
+        notify,
+        message=message,
+        parents=[head],
+        base_tree=base_tree,
+        known_blobs=repo_tree.values(),
+        deleted=plan.deleted
+    )
+    result.update(status="upgraded", commit=commit_sha, transfer=transfer)
+
+    if mode == "pull_request":
+        pull = await gh.create_pull_request(
+            full_name,
+            message,
+            head=target,
+            base=branch,
+            body="Files you changed since they were generated are left as they are: "
+                 + (", ".join(plan.conflicts) if plan.conflicts else "none")
+        )
+        result["pull_request"] = pull["html_url"]
+
+    return result
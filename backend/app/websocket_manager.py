@@ -1,4 +1,4 @@
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from fastapi import WebSocket
 import json
 import asyncio
@@ -45,14 +45,16 @@ class ConnectionManager:
             for conn_id in disconnected:
                 self.disconnect(conn_id, user_id)
 
-    async def send_project_update(self, user_id: str, update_type: str, data: dict):
-        """Send a project creation update to a user"""
+    async def send_project_update(self, user_id: str, update_type: str, data: dict, job_id: Optional[str] = None):
+        """Send a project creation update to a user, tagged with its job if any"""
         message = {
             "type": "project_update",
             "update_type": update_type,
             "timestamp": datetime.utcnow().isoformat(),
             "data": data
         }
+        if job_id:
+            message["job_id"] = job_id
         await self.send_personal_message(message, user_id)
 
 
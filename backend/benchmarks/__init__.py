@@ -0,0 +1,27 @@
+"""
+Benchmarks for the performance work on the backend. Each module runs on its
+own from the backend directory, against in-process fakes of GitHub and
+Supabase, e.g.
+
+    python -m benchmarks.event_loop_latency
+"""
+import os
+from typing import Sequence
+
+# Settings are read at import time, so configure them before importing the app
+os.environ.setdefault("SUPABASE_URL", "")
+os.environ.setdefault("SUPABASE_ANON_KEY", "")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-benchmark-secret")
+
+
+def percentile(samples: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of `samples`"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def print_table(headers: Sequence[str], rows: Sequence[Sequence[object]]):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for row in (headers, *rows):
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
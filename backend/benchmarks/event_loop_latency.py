@@ -0,0 +1,155 @@
+"""
+Latency of an unrelated endpoint (GET /health) while repository creations
+are in flight.
+
+"async" runs the provisioning code as it is, against a fake GitHub that
+answers after --latency seconds without blocking. "blocking" makes the same
+fake sleep synchronously, which is what the PyGithub calls the endpoints
+used to make did to the event loop.
+
+    python -m benchmarks.event_loop_latency [--repos 20] [--latency 0.02]
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import time
+from typing import List
+
+import httpx
+
+from . import percentile, print_table
+from app.main import app
+from app.routers.github import CreateRepositoryRequest, _provision_repository
+from app.services.github_client import GitHubClient
+from app.services.template_registry import template_registry
+
+
+def fake_github(latency: float, blocking: bool):
+    """Answers every call the provisioning flow makes after `latency` seconds"""
+    repos = {}
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        method, path = request.method, request.url.path
+        body = json.loads(request.content) if request.content else None
+        if path == "/user":
+            return httpx.Response(200, json={"login": "bench", "id": 1}, headers={"X-OAuth-Scopes": "repo"})
+        if path == "/user/repos" and method == "POST":
+            name = body["name"]
+            repos[name] = {
+                "id": len(repos) + 1,
+                "name": name,
+                "full_name": f"bench/{name}",
+                "html_url": f"https://github.com/bench/{name}",
+                "clone_url": f"https://github.com/bench/{name}.git",
+                "ssh_url": f"git@github.com:bench/{name}.git",
+                "private": body["private"],
+                "description": body["description"],
+                "default_branch": "main"
+            }
+            return httpx.Response(201, json=repos[name])
+        name = path.split("/")[3]
+        if path.endswith("/git/blobs"):
+            if body["encoding"] == "base64":
+                data = base64.b64decode(body["content"])
+            else:
+                data = body["content"].encode()
+            sha = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+            return httpx.Response(201, json={"sha": sha})
+        if path.endswith(("/git/trees", "/git/commits")):
+            return httpx.Response(201, json={"sha": hashlib.sha1(request.content).hexdigest()})
+        if "/git/ref" in path:
+            return httpx.Response(200, json={"object": {"sha": "0" * 40}})
+        if path.endswith("/topics"):
+            return httpx.Response(200, json=body)
+        return httpx.Response(200, json=repos[name])
+
+    if blocking:
+        def handler(request: httpx.Request) -> httpx.Response:
+            time.sleep(latency)
+            return respond(request)
+    else:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(latency)
+            return respond(request)
+    return handler
+
+
+async def probe(client: httpx.AsyncClient, samples: List[float], stop: asyncio.Event, interval: float):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/health")
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def run(mode: str, repos: int, latency: float) -> List[float]:
+    github = GitHubClient()
+    github._get_http()
+    github._http = httpx.AsyncClient(
+        base_url=github.base_url,
+        transport=httpx.MockTransport(fake_github(latency, blocking=mode == "blocking"))
+    )
+    gh = github.session("benchmark-token")
+
+    async def notify(update_type, data=None):
+        pass
+
+    samples: List[float] = []
+    stop = asyncio.Event()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/health")  # Warm up
+        prober = asyncio.create_task(probe(client, samples, stop, interval=0.005))
+        if mode == "idle":
+            await asyncio.sleep(1.0)
+        else:
+            # Quiet the per-repository progress logging
+            with contextlib.redirect_stdout(io.StringIO()):
+                await asyncio.gather(*(
+                    _provision_repository(
+                        gh,
+                        CreateRepositoryRequest(name=f"bench-{mode}-{i}"),
+                        template_registry.default_name,
+                        {"id": "bench"},
+                        notify,
+                        checkpoint={}
+                    )
+                    for i in range(repos)
+                ))
+        stop.set()
+        await prober
+    await github.close()
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per fake GitHub call")
+    args = parser.parse_args()
+
+    await template_registry.load(template_registry.default_name)
+    rows = []
+    for mode in ("idle", "async", "blocking"):
+        started = time.perf_counter()
+        samples = await run(mode, args.repos, args.latency)
+        elapsed = time.perf_counter() - started
+        rows.append((
+            mode,
+            len(samples),
+            f"{percentile(samples, 50) * 1000:.1f}",
+            f"{percentile(samples, 99) * 1000:.1f}",
+            f"{max(samples) * 1000:.1f}",
+            f"{elapsed:.2f}"
+        ))
+
+    print(f"GET /health while {args.repos} repositories are created ({args.latency * 1000:.0f} ms per GitHub call)")
+    print_table(("mode", "requests", "p50 ms", "p99 ms", "max ms", "wall s"), rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
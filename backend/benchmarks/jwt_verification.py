@@ -0,0 +1,86 @@
+"""
+Auth overhead per request: get_current_user with every token verified from
+scratch (as before the verified-token cache) against the cached path, for
+HS256 and ES256 tokens. Requests are issued as concurrent batches with a
+small pool of tokens, the way polling dashboards reuse theirs.
+
+    python -m benchmarks.jwt_verification [--requests 20000] [--tokens 50]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Optional
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi.security import HTTPAuthorizationCredentials
+from jwt.algorithms import ECAlgorithm
+
+from . import print_table
+from app.auth import auth as auth_module
+from app.config import get_settings
+
+
+def make_tokens(count: int, algorithm: str, key, kid: Optional[str] = None):
+    headers = {"kid": kid} if kid else None
+    return [
+        jwt.encode(
+            {"sub": f"user-{i}", "aud": "authenticated", "exp": int(time.time()) + 3600},
+            key,
+            algorithm=algorithm,
+            headers=headers
+        )
+        for i in range(count)
+    ]
+
+
+async def requests_per_second(tokens, requests: int, cached: bool, concurrency: int = 100) -> float:
+    credentials = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=t) for t in tokens]
+
+    async def one(i: int):
+        if not cached:
+            auth_module.verified_tokens.clear()
+        await auth_module.get_current_user(credentials[i % len(credentials)])
+
+    auth_module.verified_tokens.clear()
+    start = time.perf_counter()
+    for batch in range(0, requests, concurrency):
+        await asyncio.gather(*(one(i) for i in range(batch, min(batch + concurrency, requests))))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=50)
+    args = parser.parse_args()
+
+    # Serve an ES256 key from the JWKS cache without a network fetch
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    jwk = json.loads(ECAlgorithm.to_jwk(ec_key.public_key()))
+    jwk.update(kid="bench", alg="ES256", use="sig")
+    auth_module.jwks_cache._keys = {"bench": jwt.PyJWK(jwk)}
+
+    rows = []
+    for algorithm, tokens in (
+        ("HS256", make_tokens(args.tokens, "HS256", get_settings().JWT_SECRET_KEY)),
+        ("ES256", make_tokens(args.tokens, "ES256", ec_key, kid="bench")),
+    ):
+        before = await requests_per_second(tokens, args.requests, cached=False)
+        after = await requests_per_second(tokens, args.requests, cached=True)
+        rows.append((
+            algorithm,
+            f"{before:,.0f}",
+            f"{1e6 / before:.1f}",
+            f"{after:,.0f}",
+            f"{1e6 / after:.1f}",
+            f"{after / before:.1f}x"
+        ))
+
+    print(f"get_current_user over {args.requests} requests with {args.tokens} distinct tokens")
+    print_table(("alg", "uncached req/s", "us/req", "cached req/s", "us/req", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
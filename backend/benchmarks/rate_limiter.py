@@ -0,0 +1,126 @@
+"""
+Rate limiter check cost and memory with 100k distinct client IPs: the
+previous per-IP lists of datetimes, rebuilt on every request, against the
+LRU-bounded token buckets.
+
+    python -m benchmarks.rate_limiter [--clients 100000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, List, Sequence
+
+from . import print_table
+from app.rate_limit import MemoryRateLimitBackend
+
+LIMIT = 100
+PERIOD = 60
+
+
+class TimestampListLimiter:
+    """The previous RateLimitMiddleware bookkeeping, minus the HTTP parts"""
+
+    def __init__(self, calls: int, period: int):
+        self.calls = calls
+        self.period = timedelta(seconds=period)
+        self.clients = defaultdict(list)
+        self.cleanup_interval = 300
+        self.last_cleanup = time.time()
+
+    def acquire(self, client_id: str) -> bool:
+        now = datetime.now()
+        if time.time() - self.last_cleanup > self.cleanup_interval:
+            self._cleanup_old_entries()
+            self.last_cleanup = time.time()
+        requests = self.clients[client_id]
+        requests[:] = [req_time for req_time in requests if req_time > now - self.period]
+        if len(requests) >= self.calls:
+            return False
+        requests.append(now)
+        return True
+
+    def _cleanup_old_entries(self):
+        now = datetime.now()
+        for client_id in list(self.clients.keys()):
+            self.clients[client_id] = [
+                req_time for req_time in self.clients[client_id]
+                if req_time > now - timedelta(hours=1)
+            ]
+            if not self.clients[client_id]:
+                del self.clients[client_id]
+
+
+def ns_per_op(acquire: Callable[[str], object], keys: Sequence[str]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        acquire(key)
+    return (time.perf_counter() - start) / len(keys) * 1e9
+
+
+def table_bytes(make: Callable[[], Callable[[str], object]], ips: List[str]) -> int:
+    tracemalloc.start()
+    acquire = make()
+    for ip in ips:
+        acquire(ip)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory
+
+
+def measure(make: Callable[[], Callable[[str], object]], ips: List[str], hits: List[str], hot: List[str]):
+    acquire = make()
+    first = ns_per_op(acquire, ips)
+    repeat = ns_per_op(acquire, hits)
+    memory = table_bytes(make, ips)
+    # One client sending its whole budget: the old cost grows with the limit
+    hot_cost = ns_per_op(make(), hot)
+    return first, repeat, hot_cost, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100000)
+    args = parser.parse_args()
+
+    ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.clients)]
+    rng = random.Random(0)
+    hits = [rng.choice(ips) for _ in range(args.clients * 2)]
+    hot = ["203.0.113.7"] * LIMIT
+
+    def old():
+        return TimestampListLimiter(LIMIT, PERIOD).acquire
+
+    def new():
+        backend = MemoryRateLimitBackend(max_clients=args.clients)
+        return lambda key: backend.acquire_nowait(key, LIMIT, PERIOD)
+
+    rows = []
+    for label, make in (("timestamp lists", old), ("token buckets", new)):
+        first, repeat, hot_cost, memory = measure(make, ips, hits, hot)
+        rows.append((
+            label,
+            f"{first:.0f}",
+            f"{repeat:.0f}",
+            f"{hot_cost:.0f}",
+            f"{memory / 1024 / 1024:.1f}"
+        ))
+
+    print(f"{args.clients} distinct IPs, limit {LIMIT}/{PERIOD}s; ns per check")
+    print_table(("limiter", "new client", "repeat client", f"hot client x{LIMIT}", "table MiB"), rows)
+
+    # Twice as many clients as the bucket table holds, all inside one window
+    churn_ips = [f"c{i}" for i in range(args.clients * 2)]
+    limiter = TimestampListLimiter(LIMIT, PERIOD)
+    ns_per_op(limiter.acquire, churn_ips)
+    backend = MemoryRateLimitBackend(max_clients=args.clients)
+    churn = ns_per_op(lambda key: backend.acquire_nowait(key, LIMIT, PERIOD), churn_ips)
+    print()
+    print(f"{len(churn_ips)} clients: timestamp lists keep {len(limiter.clients)} entries, "
+          f"token buckets keep {len(backend)} ({churn:.0f} ns per check with eviction)")
+
+
+if __name__ == "__main__":
+    main()
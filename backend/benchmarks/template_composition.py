@@ -0,0 +1,76 @@
+"""
+Cost of composing the base template with 0..N overlay layers, and of
+rendering the result: composing from the layers' cached snapshots, looking
+up a memoized composition, and rendering with a cold and a warm render cache.
+
+    python -m benchmarks.template_composition [--rounds 500]
+"""
+import argparse
+import time
+from typing import Callable
+
+from . import print_table
+from app.services.template_registry import template_registry
+from app.services.template_service import compose_snapshots
+
+PROJECT_CONFIG = {
+    "name": "bench-app",
+    "description": "A new SaaS project created with 5AM Founder",
+    "github_username": "bench",
+    "repo_url": "https://github.com/bench/bench-app",
+}
+
+
+def per_call(func: Callable[[], object], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    name = template_registry.default_name
+    all_layers = list(template_registry._layer_specs)
+    base = template_registry.get(name)
+    base.snapshot
+
+    rows = []
+    for count in range(len(all_layers) + 1):
+        layers = tuple(all_layers[:count])
+        composed = template_registry.get(name, layers=layers)
+        composed.snapshot
+        parts = [(layer, template_registry._layers[layer].snapshot) for layer in layers]
+
+        compose = per_call(lambda: compose_snapshots(base.snapshot, parts), args.rounds)
+        lookup = per_call(lambda: template_registry.get(name, layers=layers).snapshot, args.rounds)
+
+        def render_cold():
+            template_registry.render_cache.clear()
+            composed.prepare_template_files(PROJECT_CONFIG)
+
+        render_cold_time = per_call(render_cold, args.rounds)
+        render_warm_time = per_call(lambda: composed.prepare_template_files(PROJECT_CONFIG), args.rounds)
+
+        rows.append((
+            count,
+            "+".join(layers) or "-",
+            len(composed.snapshot.files),
+            f"{compose * 1e6:.1f}",
+            f"{lookup * 1e6:.2f}",
+            f"{render_cold_time * 1e6:.1f}",
+            f"{render_warm_time * 1e6:.1f}"
+        ))
+
+    print("Microseconds per call; layer snapshots are loaded once up front")
+    print_table(
+        ("layers", "overlays", "files", "compose", "memoized", "render cold", "render warm"),
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import { NextResponse } from 'next/server'
+import { verifyWebhookSignature } from '@/lib/stripe'
+
+export async function POST(request: Request) {
+  const payload = await request.text()
+  const isValid = verifyWebhookSignature(
+    payload,
+    request.headers.get('stripe-signature'),
+    process.env.STRIPE_WEBHOOK_SECRET || ''
+  )
+
+  if (!isValid) {
+    return NextResponse.json(
+      { error: 'Invalid signature' },
+      { status: 400 }
+    )
+  }
+
+  const event = JSON.parse(payload)
+
+  switch (event.type) {
+    case 'checkout.session.completed':
+      // Fulfil the purchase for event.data.object
+      break
+    default:
+      break
+  }
+
+  return NextResponse.json({ received: true })
+}
@@ -0,0 +1,62 @@
+import crypto from 'crypto'
+
+const STRIPE_API_URL = 'https://api.stripe.com/v1'
+
+/**
+ * Call the Stripe REST API with form-encoded parameters.
+ */
+export async function stripeRequest<T = any>(
+  path: string,
+  params: Record<string, string> = {},
+  method: 'GET' | 'POST' = 'POST'
+): Promise<T> {
+  const body = new URLSearchParams(params)
+  const response = await fetch(
+    `${STRIPE_API_URL}${path}${method === 'GET' ? `?${body}` : ''}`,
+    {
+      method,
+      headers: {
+        Authorization: `Bearer ${process.env.STRIPE_SECRET_KEY}`,
+        'Content-Type': 'application/x-www-form-urlencoded',
+      },
+      body: method === 'POST' ? body : undefined,
+    }
+  )
+
+  const data = await response.json()
+  if (!response.ok) {
+    throw new Error(data?.error?.message || `Stripe request failed: ${response.status}`)
+  }
+  return data
+}
+
+/**
+ * Verify a webhook payload against the Stripe-Signature header.
+ */
+export function verifyWebhookSignature(
+  payload: string,
+  header: string | null,
+  secret: string,
+  toleranceSeconds = 300
+): boolean {
+  if (!header) return false
+
+  const parts = Object.fromEntries(
+    header.split(',').map((part) => part.split('=') as [string, string])
+  )
+  const timestamp = Number(parts.t)
+  if (!timestamp || Math.abs(Date.now() / 1000 - timestamp) > toleranceSeconds) {
+    return false
+  }
+
+  const expected = crypto
+    .createHmac('sha256', secret)
+    .update(`${timestamp}.${payload}`)
+    .digest('hex')
+
+  const signature = parts.v1 || ''
+  return (
+    signature.length === expected.length &&
+    crypto.timingSafeEqual(Buffer.from(signature), Buffer.from(expected))
+  )
+}
@@ -0,0 +1,176 @@
+import base64
+import itertools
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Settings are read at import time, so configure them before importing the app
+os.environ.setdefault("SUPABASE_URL", "")
+os.environ.setdefault("SUPABASE_ANON_KEY", "")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-test-secret-test-secret")
+
+import httpx
+import pytest
+
+from app.services.github_client import GitHubClient
+from app.services.template_service import git_blob_sha
+
+
+def mock_github_client(handler: Callable[[httpx.Request], httpx.Response], **kwargs: Any) -> GitHubClient:
+    """A GitHubClient whose requests are answered by `handler`"""
+    client = GitHubClient(**kwargs)
+    client._get_http()
+    client._http = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+class FakeGitRepository:
+    """
+    In-memory stand-in for one repository's Git Data API: refs, commits,
+    trees and blobs, plus pull requests. Blob uploads whose content is in
+    `fail_blobs` answer with an error.
+    """
+
+    def __init__(self, full_name: str = "alice/proj"):
+        self.full_name = full_name
+        self.repo = {
+            "id": 1,
+            "name": full_name.split("/")[1],
+            "full_name": full_name,
+            "html_url": f"https://github.com/{full_name}",
+            "description": None,
+            "default_branch": "main"
+        }
+        self.blobs: Dict[str, bytes] = {}
+        self.trees: Dict[str, Dict[str, str]] = {}
+        self.commits: Dict[str, Dict[str, Any]] = {}
+        self.refs: Dict[str, str] = {}
+        self.pulls: List[Dict[str, Any]] = []
+        self.calls: List[Tuple[str, str]] = []
+        self.fail_blobs: Set[bytes] = set()
+        self._ids = itertools.count(1)
+
+    def put_blob(self, data: bytes) -> str:
+        sha = git_blob_sha(data)
+        self.blobs[sha] = data
+        return sha
+
+    def commit_tree(self, files: Dict[str, bytes], branch: str = "main") -> str:
+        """Make `files` the content of `branch`"""
+        tree = {path: self.put_blob(data) for path, data in files.items()}
+        tree_sha = f"t{next(self._ids)}"
+        self.trees[tree_sha] = tree
+        commit_sha = f"c{next(self._ids)}"
+        self.commits[commit_sha] = {"tree": tree_sha}
+        self.refs[f"heads/{branch}"] = commit_sha
+        return commit_sha
+
+    def files(self, branch: str = "main") -> Dict[str, bytes]:
+        tree = self.trees[self.commits[self.refs[f"heads/{branch}"]]["tree"]]
+        return {path: self.blobs[sha] for path, sha in tree.items()}
+
+    def count(self, method: str, suffix: str) -> int:
+        return sum(1 for m, path in self.calls if m == method and path.endswith(suffix))
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        method, path = request.method, request.url.path
+        self.calls.append((method, path))
+        body = json.loads(request.content) if request.content else None
+        if path == "/user":
+            return httpx.Response(
+                200,
+                json={"login": self.full_name.split("/")[0], "id": 7},
+                headers={"X-OAuth-Scopes": "repo, delete_repo"}
+            )
+        if path == "/user/repos" and method == "POST":
+            self.repo.update(name=body["name"], description=body["description"], private=body["private"])
+            self.repo.update(clone_url=f"{self.repo['html_url']}.git", ssh_url=f"git@github.com:{self.full_name}.git")
+            self.commit_tree({"README.md": b"# " + body["name"].encode()})
+            return httpx.Response(201, json=self.repo)
+        prefix = f"/repos/{self.full_name}"
+        if not path.startswith(prefix):
+            return httpx.Response(404, json={"message": "Not Found"})
+        rest = path[len(prefix):].lstrip("/")
+
+        if rest == "" and method == "GET":
+            return httpx.Response(200, json=self.repo)
+        if rest.startswith("git/ref/") and method == "GET":
+            ref = rest[len("git/ref/"):]
+            if ref not in self.refs:
+                return httpx.Response(404, json={"message": "Not Found"})
+            return httpx.Response(200, json={"object": {"sha": self.refs[ref]}})
+        if rest == "git/refs" and method == "POST":
+            ref = body["ref"][len("refs/"):]
+            if ref in self.refs:
+                return httpx.Response(422, json={"message": "Reference already exists"})
+            self.refs[ref] = body["sha"]
+            return httpx.Response(201, json={})
+        if rest.startswith("git/refs/") and method == "PATCH":
+            self.refs[rest[len("git/refs/"):]] = body["sha"]
+            return httpx.Response(200, json={})
+        if rest.startswith("git/commits/"):
+            return httpx.Response(200, json={"tree": {"sha": self.commits[rest[len("git/commits/"):]]["tree"]}})
+        if rest == "git/commits":
+            sha = f"c{next(self._ids)}"
+            self.commits[sha] = body
+            return httpx.Response(201, json={"sha": sha})
+        if rest.startswith("git/trees/"):
+            tree = self.trees[rest[len("git/trees/"):]]
+            entries = [{"path": p, "sha": s, "type": "blob"} for p, s in tree.items()]
+            return httpx.Response(200, json={"tree": entries, "truncated": False})
+        if rest == "git/trees":
+            tree = dict(self.trees[body["base_tree"]]) if body.get("base_tree") else {}
+            for entry in body["tree"]:
+                if "content" in entry:
+                    tree[entry["path"]] = self.put_blob(entry["content"].encode())
+                elif entry["sha"] is None:
+                    tree.pop(entry["path"], None)
+                elif entry["sha"] not in self.blobs:
+                    return httpx.Response(422, json={"message": "Invalid tree entry"})
+                else:
+                    tree[entry["path"]] = entry["sha"]
+            sha = f"t{next(self._ids)}"
+            self.trees[sha] = tree
+            return httpx.Response(201, json={"sha": sha})
+        if rest.startswith("git/blobs/"):
+            data = self.blobs[rest[len("git/blobs/"):]]
+            return httpx.Response(200, json={"content": base64.b64encode(data).decode(), "encoding": "base64"})
+        if rest == "git/blobs":
+            if body["encoding"] == "base64":
+                data = base64.b64decode(body["content"])
+            else:
+                data = body["content"].encode()
+            if data in self.fail_blobs:
+                return httpx.Response(422, json={"message": "Blob rejected"})
+            return httpx.Response(201, json={"sha": self.put_blob(data)})
+        if rest == "topics" and method == "PUT":
+            self.repo["topics"] = body["names"]
+            return httpx.Response(200, json={"names": body["names"]})
+        if rest == "pulls":
+            self.pulls.append(body)
+            return httpx.Response(201, json={"html_url": f"https://github.com/{self.full_name}/pull/{len(self.pulls)}"})
+        return httpx.Response(404, json={"message": f"Unhandled {method} {path}"})
+
+
+@pytest.fixture
+def git_repo() -> FakeGitRepository:
+    return FakeGitRepository()
+
+
+@pytest.fixture
+async def gh(git_repo: FakeGitRepository):
+    """A GitHub session talking to `git_repo`"""
+    client = mock_github_client(git_repo.handler, retry_base_delay=0)
+    yield client.session("token")
+    await client.close()
+
+
+@pytest.fixture
+def notify() -> Callable:
+    events: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+
+    async def record(event: str, data: Optional[Dict[str, Any]] = None):
+        events.append((event, data))
+
+    record.events = events
+    return record
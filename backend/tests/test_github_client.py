@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import github_client as github_client_module
+from app.services.github_client import GitHubAPIError
+
+from conftest import mock_github_client
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """
+    Record asyncio.sleep calls in the client instead of waiting; the clock
+    moves on to when the latest sleeper would have woken
+    """
+    recorded = []
+    real_sleep = asyncio.sleep
+    real_time = time.time
+    now = [real_time()]
+
+    async def fake_sleep(seconds):
+        recorded.append(seconds)
+        woken = time.time() + seconds
+        # Yield like a real sleep, so concurrent callers interleave
+        await real_sleep(0)
+        now[0] = max(now[0], woken)
+
+    monkeypatch.setattr(github_client_module.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(github_client_module.time, "time", lambda: now[0])
+    return recorded
+
+
+def _rate_limited_handler(remaining: int, reset_in: float):
+    state = {"remaining": remaining}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers = {
+            "X-RateLimit-Remaining": str(state["remaining"]),
+            "X-RateLimit-Reset": str(int(time.time() + reset_in))
+        }
+        state["remaining"] = max(0, state["remaining"] - 1)
+        return httpx.Response(200, json={"login": "alice"}, headers=headers)
+
+    return handler
+
+
+async def test_pacing_below_watermark_waits_at_most_the_limit(sleeps):
+    # An hour to reset with 49 requests left paces at ~73s, above the 60s limit
+    client = mock_github_client(_rate_limited_handler(49, 3600), max_rate_limit_wait=60)
+
+    for _ in range(5):
+        response = await client.request("token", "GET", "/user")
+        assert response.status_code == 200
+
+    assert sleeps
+    assert all(0 < seconds <= 60 for seconds in sleeps)
+    await client.close()
+
+
+async def test_exhausted_budget_beyond_wait_limit_raises(sleeps):
+    client = mock_github_client(_rate_limited_handler(0, 3600), max_rate_limit_wait=60)
+
+    await client.request("token", "GET", "/user")
+    with pytest.raises(GitHubAPIError) as error:
+        await client.request("token", "GET", "/user")
+
+    assert error.value.status == 429
+    assert sleeps == []
+    await client.close()
+
+
+async def test_concurrent_requests_are_spaced_out(sleeps):
+    # 49 requests left and ~26s to reset paces at ~0.53s per request
+    client = mock_github_client(_rate_limited_handler(49, 26), max_rate_limit_wait=60)
+    await client.request("token", "GET", "/user")
+    sleeps.clear()
+
+    await asyncio.gather(*(client.request("token", "GET", "/user") for _ in range(8)))
+
+    # The first goes out at once and each of the others one interval later
+    assert len(sleeps) == 7
+    slots = [0.0] + sorted(sleeps)
+    gaps = [later - earlier for earlier, later in zip(slots, slots[1:])]
+    assert all(0.45 < gap < 0.7 for gap in gaps)
+    await client.close()
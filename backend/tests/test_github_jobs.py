@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import httpx
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.rate_limit import rate_limit_backend
+from app.services.github_client import github_client
+
+
+@pytest.fixture(scope="module")
+def client():
+    """One app lifetime for the module, since the job queue belongs to its event loop"""
+    def revoked(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(401, json={"message": "Bad credentials"})
+
+    token = jwt.encode(
+        {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 600},
+        get_settings().JWT_SECRET_KEY,
+        algorithm="HS256"
+    )
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            github_client,
+            "_http",
+            httpx.AsyncClient(base_url=github_client.base_url, transport=httpx.MockTransport(revoked))
+        )
+        monkeypatch.setattr(github_client, "_semaphore", asyncio.Semaphore(github_client.max_concurrent_requests))
+        # Start from a full budget whatever earlier tests spent
+        rate_limit_backend._buckets.clear()
+        with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as client:
+            yield client
+
+
+def _wait(client: TestClient, job_id: str) -> dict:
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        response = client.get(f"/api/v1/jobs/{job_id}")
+        assert response.status_code == 200
+        job = response.json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/v1/github/repositories/bulk", {"repositories": [{"name": "one"}, {"name": "two"}]}),
+    ("/api/v1/github/repositories/upgrade", {"repositories": ["alice/one"]}),
+    ("/api/v1/github/repositories/alice/one/upgrade", {}),
+    ("/api/v1/github/repositories/bulk-delete", {"repositories": ["alice/one"]}),
+])
+def test_revoked_token_fails_the_job_with_a_reconnect_message(client, path, body):
+    # A distinct token per case, so no identity is cached from another test
+    response = client.post(path, json=body, headers={"X-GitHub-Token": f"revoked-{path}"})
+    assert response.status_code == 202
+
+    job = _wait(client, response.json()["id"])
+    assert job["status"] == "failed"
+    assert job["error"] == {
+        "status_code": 401,
+        "detail": "GitHub token is invalid or expired. Please reconnect your GitHub account."
+    }
+
+
+def test_bulk_requests_require_a_github_token(client):
+    response = client.post("/api/v1/github/repositories/bulk-delete", json={"repositories": ["alice/one"]})
+    assert response.status_code == 401
+    assert "GitHub token not found" in response.json()["detail"]
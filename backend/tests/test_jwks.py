@@ -0,0 +1,173 @@
+import asyncio
+import json
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi import HTTPException
+from jwt.algorithms import ECAlgorithm, RSAAlgorithm
+
+from app.auth import auth as auth_module
+from app.auth import jwks as jwks_module
+from app.auth.jwks import JWKSCache
+from app.config import get_settings
+
+JWKS_URL = "https://project.supabase.co/auth/v1/.well-known/jwks.json"
+
+
+def _jwk(algorithm_class, public_key, kid: str, alg: str):
+    jwk = json.loads(algorithm_class.to_jwk(public_key))
+    jwk.update(kid=kid, alg=alg, use="sig")
+    return jwk
+
+
+class JWKSServer:
+    """Serves a key set the way Supabase does, counting fetches"""
+
+    def __init__(self):
+        self.ec_key = ec.generate_private_key(ec.SECP256R1())
+        self.rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.keys = [
+            _jwk(ECAlgorithm, self.ec_key.public_key(), "ec-1", "ES256"),
+            _jwk(RSAAlgorithm, self.rsa_key.public_key(), "rsa-1", "RS256"),
+        ]
+        self.max_age = 300
+        self.status = 200
+        self.fetches = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.fetches += 1
+        if self.status != 200:
+            return httpx.Response(self.status, json={"message": "unavailable"})
+        return httpx.Response(
+            200,
+            json={"keys": self.keys},
+            headers={"Cache-Control": f"public, max-age={self.max_age}"}
+        )
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = JWKSServer()
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        jwks_module.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(server.handler), **kwargs)
+    )
+    return server
+
+
+@pytest.fixture
+async def cache(server, monkeypatch):
+    cache = JWKSCache(JWKS_URL, refresh_interval=600, min_refresh_interval=30)
+    monkeypatch.setattr(auth_module, "jwks_cache", cache)
+    yield cache
+    await cache.stop()
+
+
+def _token(key, algorithm: str, kid: str, sub: str = "user-1") -> str:
+    claims = {"sub": sub, "aud": "authenticated", "exp": int(time.time()) + 600}
+    return jwt.encode(claims, key, algorithm=algorithm, headers={"kid": kid})
+
+
+@pytest.mark.parametrize("algorithm,kid,key_attr", [("ES256", "ec-1", "ec_key"), ("RS256", "rsa-1", "rsa_key")])
+async def test_asymmetric_token_verifies_against_served_jwks(server, cache, algorithm, kid, key_attr):
+    await cache.start()
+
+    token = _token(getattr(server, key_attr), algorithm, kid, sub=f"user-{algorithm}")
+    payload = await auth_module.verify_jwt_token(token)
+
+    assert payload["sub"] == f"user-{algorithm}"
+    assert server.fetches == 1
+
+
+async def test_token_signed_by_another_key_is_rejected(server, cache):
+    await cache.start()
+
+    forged = _token(ec.generate_private_key(ec.SECP256R1()), "ES256", "ec-1")
+    with pytest.raises(HTTPException) as error:
+        await auth_module.verify_jwt_token(forged)
+    assert error.value.status_code == 401
+
+
+async def test_unknown_kid_triggers_one_rate_limited_refresh(server, cache):
+    await cache.start()
+    cache._last_fetch -= cache.min_refresh_interval
+
+    # A key rotated in after startup
+    rotated = ec.generate_private_key(ec.SECP256R1())
+    server.keys.append(_jwk(ECAlgorithm, rotated.public_key(), "ec-2", "ES256"))
+    token = _token(rotated, "ES256", "ec-2")
+
+    # Rejected without waiting on the network; the refresh runs in the background
+    with pytest.raises(HTTPException):
+        await auth_module.verify_jwt_token(token)
+    await cache._refresh
+    assert server.fetches == 2
+    assert (await auth_module.verify_jwt_token(token))["sub"] == "user-1"
+
+    # Further unknown kids within min_refresh_interval do not refetch
+    for kid in ("ec-3", "ec-4"):
+        with pytest.raises(HTTPException):
+            await auth_module.verify_jwt_token(_token(rotated, "ES256", kid))
+    await asyncio.sleep(0)
+    assert server.fetches == 2
+
+
+async def test_background_refresh_at_80_percent_of_max_age(server, cache, monkeypatch):
+    server.max_age = 100
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) > 1:
+            await real_sleep(3600)
+
+    monkeypatch.setattr(jwks_module.asyncio, "sleep", fake_sleep)
+    await cache.start()
+    for _ in range(5):
+        await real_sleep(0)
+
+    assert sleeps[0] == pytest.approx(80, abs=1)
+    assert server.fetches == 2
+
+
+async def test_max_age_is_capped_by_refresh_interval(server, cache):
+    server.max_age = 86400
+    await cache.start()
+    assert cache._expires_at - time.monotonic() == pytest.approx(cache.refresh_interval, abs=1)
+
+
+async def test_startup_fetch_failure_is_not_fatal(server, cache, monkeypatch):
+    server.status = 503
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) > 2:
+            await real_sleep(3600)
+
+    monkeypatch.setattr(jwks_module.asyncio, "sleep", fake_sleep)
+    await cache.start()
+    for _ in range(5):
+        await real_sleep(0)
+
+    # Retried with backoff rather than at the normal interval
+    assert sleeps[:2] == [1.0, 2.0]
+    assert server.fetches == 3
+
+    with pytest.raises(HTTPException):
+        await auth_module.verify_jwt_token(_token(server.ec_key, "ES256", "ec-1"))
+
+    # Shared-secret tokens do not depend on the key set
+    hs256 = jwt.encode(
+        {"sub": "user-hs", "aud": "authenticated", "exp": int(time.time()) + 600},
+        get_settings().JWT_SECRET_KEY,
+        algorithm="HS256"
+    )
+    assert (await auth_module.verify_jwt_token(hs256))["sub"] == "user-hs"
@@ -0,0 +1,103 @@
+import time
+
+import fakeredis
+import pytest
+
+from app import rate_limit as rate_limit_module
+from app.rate_limit import (
+    MemoryRateLimitBackend,
+    RateLimitBackend,
+    RedisRateLimitBackend,
+)
+
+
+def _redis_backend(server: fakeredis.FakeServer, **kwargs) -> RedisRateLimitBackend:
+    """A Redis backend talking to an in-process fake server that runs Lua"""
+    backend = RedisRateLimitBackend("redis://localhost:6379/0", **kwargs)
+    backend._redis = fakeredis.FakeAsyncRedis(server=server)
+    backend._script = backend._redis.register_script(rate_limit_module.TOKEN_BUCKET_SCRIPT)
+    return backend
+
+
+@pytest.fixture
+def server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+async def test_memory_backend_refills_over_time(monkeypatch):
+    backend = MemoryRateLimitBackend()
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit_module.time, "monotonic", lambda: now[0])
+
+    results = [await backend.acquire("client", 3, 3) for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[-1].retry_after == pytest.approx(1.0)
+
+    now[0] += 1.0
+    assert (await backend.acquire("client", 3, 3)).allowed
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryRateLimitBackend(max_clients=2)
+    for key in ("a", "b", "a", "c"):
+        await backend.acquire(key, 10, 60)
+
+    assert len(backend) == 2
+    assert list(backend._buckets) == ["a", "c"]
+
+
+async def test_lua_token_bucket(server):
+    backend = _redis_backend(server)
+
+    results = [await backend.acquire("default:ip:1.2.3.4", 5, 60, cost=2) for _ in range(3)]
+
+    assert [r.allowed for r in results] == [True, True, False]
+    assert [r.remaining for r in results] == [3, 1, 1]
+    # One token left, two needed, at 5 per 60s
+    assert results[-1].retry_after == pytest.approx(12, abs=0.1)
+
+    redis = backend._redis
+    stored = await redis.hgetall("ratelimit:default:ip:1.2.3.4")
+    assert float(stored[b"tokens"]) == pytest.approx(1, abs=0.01)
+    # Expires once the bucket would be full again, plus a second of slack
+    assert 48_000 < await redis.pttl("ratelimit:default:ip:1.2.3.4") <= 49_000
+    await backend.close()
+
+
+async def test_backends_share_state_through_redis(server):
+    workers = [_redis_backend(server), _redis_backend(server)]
+
+    results = [await workers[i % 2].acquire("default:user:u1", 10, 60) for i in range(12)]
+
+    assert sum(r.allowed for r in results) == 10
+    assert not results[-1].allowed and not results[-2].allowed
+    # Other clients have their own buckets
+    assert (await workers[1].acquire("default:user:u2", 10, 60)).allowed
+    for worker in workers:
+        await worker.close()
+
+
+async def test_falls_back_to_memory_while_redis_is_unavailable(server, capsys):
+    fallback = MemoryRateLimitBackend()
+    backend = _redis_backend(server, fallback=fallback, retry_interval=5)
+    server.connected = False
+
+    results = [await backend.acquire("default:ip:1.2.3.4", 2, 60) for _ in range(3)]
+
+    assert [r.allowed for r in results] == [True, True, False]
+    assert len(fallback) == 1
+    # Reported once, not per request
+    assert capsys.readouterr().out.count("Rate limit store unavailable") == 1
+
+    # Redis is not retried until retry_interval has passed
+    server.connected = True
+    assert not (await backend.acquire("default:ip:1.2.3.4", 2, 60)).allowed
+    backend._retry_at = time.monotonic()
+    assert (await backend.acquire("default:ip:1.2.3.4", 2, 60)).allowed
+    assert "available again" in capsys.readouterr().out
+    await backend.close()
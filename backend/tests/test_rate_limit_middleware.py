@@ -0,0 +1,84 @@
+import time
+from typing import Any, Dict, List
+
+import jwt
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.auth.auth import verified_tokens, verify_jwt_token
+from app.config import get_settings
+from app.middleware import RateLimitMiddleware
+from app.rate_limit import MemoryRateLimitBackend, RateLimitRules
+
+
+def _token(sub: str) -> str:
+    return jwt.encode(
+        {"sub": sub, "aud": "authenticated", "exp": int(time.time()) + 600},
+        get_settings().JWT_SECRET_KEY,
+        algorithm="HS256"
+    )
+
+
+@pytest.fixture
+def backend() -> MemoryRateLimitBackend:
+    return MemoryRateLimitBackend()
+
+
+@pytest.fixture
+def client(backend):
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=backend,
+        rules=RateLimitRules(
+            [{"methods": ["POST"], "path": "/bulk", "items": "repositories", "cost_per_item": 10}],
+            {"default": {"limit": 100, "period": 60}}
+        )
+    )
+
+    @app.post("/bulk")
+    async def bulk(request: Request) -> Dict[str, Any]:
+        return {"body": (await request.body()).decode()}
+
+    @app.get("/items")
+    async def items() -> List[str]:
+        return []
+
+    verified_tokens.clear()
+    with TestClient(app) as client:
+        yield client
+    verified_tokens.clear()
+
+
+def test_bulk_requests_are_charged_per_item(client):
+    body = b'{"repositories": ["a", "b", "c"]}'
+    response = client.post("/bulk", content=body)
+    assert response.status_code == 200
+    # The endpoint still receives the body the middleware read
+    assert response.json() == {"body": body.decode()}
+    assert response.headers["X-RateLimit-Remaining"] == "69"
+
+    # A body without the list pays only the base cost
+    response = client.post("/bulk", content=b"not json")
+    assert response.headers["X-RateLimit-Remaining"] == "68"
+
+
+def test_bulk_cost_is_capped_at_the_bucket_size(client):
+    response = client.post("/bulk", json={"repositories": ["x"] * 20})
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+
+async def test_verified_tokens_get_their_own_budget(client, backend, capsys):
+    alice, bob = _token("alice"), _token("bob")
+    await verify_jwt_token(alice)
+
+    client.get("/items", headers={"Authorization": f"Bearer {alice}"})
+    # Not verified yet: counted against the IP, without verifying it here
+    client.get("/items", headers={"Authorization": f"Bearer {bob}"})
+    client.get("/items", headers={"Authorization": "Bearer not-a-jwt"})
+
+    assert set(backend._buckets) == {"default:user:alice", "default:ip:testclient"}
+    assert backend._buckets["default:ip:testclient"][0] == pytest.approx(98, abs=0.1)
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,49 @@
+import io
+import time
+import zipfile
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    token = jwt.encode(
+        {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 600},
+        get_settings().JWT_SECRET_KEY,
+        algorithm="HS256"
+    )
+    with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as client:
+        yield client
+
+
+@pytest.mark.parametrize("name", [".", "..", ".hidden", "../escape", "a/b"])
+def test_export_rejects_names_that_escape_the_archive_root(client, name):
+    response = client.get("/api/v1/templates/export", params={"name": name})
+    assert response.status_code == 422
+
+    response = client.post("/api/v1/templates/export", json={"name": name})
+    assert response.status_code == 422
+
+
+def test_export_zip_entries_stay_under_the_project_root(client):
+    response = client.get("/api/v1/templates/export", params={"name": "my-app.v2"})
+    assert response.status_code == 200
+
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert names
+    assert all(name.startswith("my-app.v2/") and ".." not in name.split("/") for name in names)
+
+
+@pytest.mark.parametrize("frontend", [["nextjs"], {"name": "nextjs"}])
+def test_export_rejects_unhashable_tech_stack_values(client, frontend):
+    response = client.post(
+        "/api/v1/templates/export",
+        json={"name": "my-app", "tech_stack": {"frontend": frontend}}
+    )
+    assert response.status_code == 422
+    assert "No template supports" in response.json()["detail"]
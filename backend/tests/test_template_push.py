@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import get_settings
+from app.routers.github import CreateRepositoryRequest, _provision_repository, _provision_slot, provision_slots
+from app.services.template_push import push_files
+from app.services.template_registry import template_registry
+from app.services.template_service import RenderedFile, git_blob_sha
+from app.services.github_client import GitHubAPIError
+
+
+def _rendered(path: str, content: str) -> RenderedFile:
+    raw = content.encode("utf-8")
+    # Not static, so each file gets its own blob upload
+    return RenderedFile(path, content, False, git_blob_sha(raw), len(raw), False)
+
+
+async def test_blobs_uploaded_before_a_failure_are_checkpointed(gh, git_repo, notify):
+    git_repo.commit_tree({"README.md": b"init"})
+    files = [_rendered(f"src/file{i}.ts", f"export const value = {i}\n") for i in range(8)]
+    git_repo.fail_blobs.add(files[3].content.encode("utf-8"))
+
+    uploaded = set()
+    with pytest.raises(GitHubAPIError):
+        await push_files(gh, git_repo.full_name, "main", files, notify, "Initial commit", uploaded=uploaded)
+
+    first_attempt = git_repo.count("POST", "/git/blobs")
+    assert files[3].blob_sha not in uploaded
+    assert uploaded <= {f.blob_sha for f in files}
+    assert len(uploaded) == first_attempt - 1
+
+    # Resuming only uploads what the first attempt did not
+    git_repo.fail_blobs.clear()
+    await push_files(
+        gh, git_repo.full_name, "main", files, notify, "Initial commit",
+        known_blobs=uploaded, uploaded=uploaded
+    )
+
+    assert git_repo.count("POST", "/git/blobs") == first_attempt + len(files) - len(uploaded) + 1
+    assert uploaded == {f.blob_sha for f in files}
+    assert git_repo.files()["src/file3.ts"] == files[3].content.encode("utf-8")
+
+
+async def test_upload_failure_is_not_reported_as_invalid_repository(gh, git_repo, notify):
+    template = await template_registry.load(template_registry.default_name)
+    rendered = template.prepare_template_files({
+        "name": "proj",
+        "description": "A new SaaS project created with 5AM Founder",
+        "github_username": "alice",
+        "repo_url": git_repo.repo["html_url"]
+    })
+    uploads = [f for f in rendered if not f.is_static or f.is_binary]
+    git_repo.fail_blobs.add(bytes(uploads[0].content) if uploads[0].is_binary else uploads[0].content.encode("utf-8"))
+
+    checkpoint = {}
+    with pytest.raises(HTTPException) as error:
+        await _provision_repository(
+            gh,
+            CreateRepositoryRequest(name="proj"),
+            template_registry.default_name,
+            {"id": "user-1"},
+            notify,
+            checkpoint=checkpoint
+        )
+
+    assert error.value.status_code == 502
+    assert "upload template files" in error.value.detail
+    assert "repo" in checkpoint
+
+
+async def test_provision_slot_is_dropped_after_last_release():
+    limit = get_settings().GITHUB_TOKEN_CONCURRENCY
+    active = 0
+    peak = 0
+
+    async def provision():
+        nonlocal active, peak
+        async with _provision_slot("token"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(provision() for _ in range(limit * 3)))
+    assert peak == limit
+    assert provision_slots == {}
+
+    task = asyncio.create_task(provision())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert provision_slots == {}
@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+
+from app.services.template_artifact import build_artifact
+from app.services.template_service import TemplateService
+
+
+def _touch_later(path: Path, than: Path):
+    """Give `path` an mtime after `than`'s, whatever the filesystem's resolution"""
+    later = than.stat().st_mtime_ns + 10 ** 9
+    os.utime(path, ns=(later, later))
+
+
+def _contents(service: TemplateService):
+    return {f.path: f.content for f in service.refresh().files}
+
+
+def test_artifact_is_used_while_current(tmp_path):
+    template = tmp_path / "app"
+    template.mkdir()
+    (template / "README.md").write_text("# {{PROJECT_NAME}}\n")
+    build_artifact(template)
+    artifact = template.with_suffix(".tpl")
+    _touch_later(artifact, template)
+
+    service = TemplateService(template, check_interval=0)
+    snapshot = service.refresh()
+    assert snapshot.fingerprint[0][0] == artifact.name
+    assert _contents(service) == {"README.md": "# {{PROJECT_NAME}}\n"}
+
+
+def test_edits_after_the_artifact_load_the_directory(tmp_path, capsys):
+    template = tmp_path / "app"
+    template.mkdir()
+    readme = template / "README.md"
+    readme.write_text("# {{PROJECT_NAME}}\n")
+    build_artifact(template)
+    artifact = template.with_suffix(".tpl")
+    _touch_later(artifact, template)
+
+    service = TemplateService(template, check_interval=0)
+    service.refresh()
+
+    readme.write_text("# {{PROJECT_NAME}} edited\n")
+    _touch_later(readme, artifact)
+    assert _contents(service) == {"README.md": "# {{PROJECT_NAME}} edited\n"}
+
+    # A new file changes the directory's mtime
+    (template / "LICENSE").write_text("MIT\n")
+    _touch_later(template, readme)
+    assert _contents(service) == {"LICENSE": "MIT\n", "README.md": "# {{PROJECT_NAME}} edited\n"}
+
+    output = capsys.readouterr().out
+    assert output.count("changed after app.tpl was built") == 1
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.routers.github import BulkUpgradeRequest
+from app.services.template_registry import template_registry
+from app.services.template_upgrade import MANIFEST_PATH, manifest_file, upgrade_repository
+
+
+async def _render(git_repo):
+    template = await template_registry.load(template_registry.default_name)
+    files = template.prepare_template_files({
+        "name": git_repo.repo["name"],
+        "description": "A new SaaS project created with 5AM Founder",
+        "github_username": "alice",
+        "repo_url": git_repo.repo["html_url"]
+    })
+    return template, files
+
+
+def _content(file) -> bytes:
+    return bytes(file.content) if file.is_binary else file.content.encode("utf-8")
+
+
+async def test_upgrade_legacy_repository_without_manifest(gh, git_repo, notify):
+    """Projects created before named templates recorded a bare "1.0.0" and have no manifest"""
+    template, files = await _render(git_repo)
+    existing = {f.path: _content(f) for f in files}
+    existing["README.md"] = b"my own readme"
+    missing = files[0].path
+    del existing[missing]
+    git_repo.commit_tree(existing)
+
+    result = await upgrade_repository(gh, git_repo.repo, "alice", notify, recorded_version="1.0.0")
+
+    assert result["status"] == "upgraded"
+    assert result["template_version"] == f"{template.name}@{template.snapshot.version}"
+    # Without a manifest only missing files are added; nothing is overwritten
+    assert result["changed"] == [missing]
+    assert "README.md" in result["conflicts"]
+    upgraded = git_repo.files()
+    assert upgraded["README.md"] == b"my own readme"
+    assert json.loads(upgraded[MANIFEST_PATH])["template"] == result["template_version"]
+
+    # The manifest now written makes the next upgrade a no-op
+    again = await upgrade_repository(gh, git_repo.repo, "alice", notify, recorded_version="1.0.0")
+    assert again["status"] == "up_to_date"
+
+
+async def test_upgrade_unregistered_template_falls_back_to_default(gh, git_repo, notify):
+    template, files = await _render(git_repo)
+    git_repo.commit_tree({f.path: _content(f) for f in files})
+
+    result = await upgrade_repository(gh, git_repo.repo, "alice", notify, recorded_version="retired+gone@abc")
+
+    assert result["status"] == "up_to_date"
+    assert result["changed"] == []
+    assert result["template_version"] == f"{template.name}@{template.snapshot.version}"
+
+
+async def test_upgrade_current_manifest_is_up_to_date(gh, git_repo, notify):
+    template, files = await _render(git_repo)
+    version = f"{template.name}@{template.snapshot.version}"
+    contents = {f.path: _content(f) for f in files}
+    manifest = manifest_file(version, files)
+    contents[MANIFEST_PATH] = manifest.content.encode("utf-8")
+    git_repo.commit_tree(contents)
+
+    result = await upgrade_repository(gh, git_repo.repo, "alice", notify, recorded_version="1.0.0")
+
+    assert result == {"status": "up_to_date", "template_version": version}
+    assert git_repo.count("POST", "/git/commits") == 0
+
+
+@pytest.mark.parametrize("count", [0, 51])
+def test_bulk_upgrade_request_is_bounded(count):
+    with pytest.raises(ValidationError):
+        BulkUpgradeRequest(repositories=[f"alice/proj-{i}" for i in range(count)])
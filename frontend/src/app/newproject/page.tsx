@@ -5,6 +5,7 @@ import Link from "next/link"
 import { useRouter } from "next/navigation"
 import { useAuth } from "@/hooks/useAuth"
 import { getGitHubToken } from "@/lib/github"
+import { waitForJob } from "@/lib/jobs"
 import { supabase } from "@/lib/supabase"
 import { ChevronLeft, ChevronRight, Sparkles, ChevronDown, Settings, LogOut } from "lucide-react"
 
@@ -429,7 +430,9 @@ export default function NewProjectPage() {
         throw new Error(errorData.detail || 'Failed to create repository')
       }
 
-      const repoData = await response.json()
+      // Repository creation runs as a background job; poll until it finishes
+      const job = await response.json()
+      const repoData = await waitForJob(job.id, session.access_token)
       // Repository created successfully
       
       // Clear saved config
@@ -17,6 +17,7 @@ interface ProjectCreationStreamProps {
 
 const updateIcons: { [key: string]: React.ReactNode } = {
   repository_created: <GitBranch className="w-4 h-4" />,
+  repository_ready: <GitBranch className="w-4 h-4" />,
   preparing_template: <Package className="w-4 h-4" />,
   template_ready: <Zap className="w-4 h-4" />,
   upload_started: <Upload className="w-4 h-4" />,
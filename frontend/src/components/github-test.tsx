@@ -3,6 +3,7 @@
 import { useState } from 'react'
 import { useAuth } from '@/hooks/useAuth'
 import { getGitHubToken } from '@/lib/github'
+import { waitForJob } from '@/lib/jobs'
 
 export default function GitHubTest() {
   const { user, signInWithGitHub } = useAuth()
@@ -135,8 +136,9 @@ export default function GitHubTest() {
         throw new Error(errorData.detail || 'Failed to create repository')
       }
 
-      const data = await response.json()
-      setCreateResult(data)
+      const job = await response.json()
+      const repository = await waitForJob(job.id, session.access_token)
+      setCreateResult(repository)
       setRepoName('')
       setRepoDescription('')
     } catch (err: any) {
@@ -0,0 +1,44 @@
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed'
+
+export interface Job {
+  id: string
+  kind: string
+  status: JobStatus
+  result?: any
+  error?: { status_code: number; detail: string } | null
+}
+
+// Repository creation usually finishes within a minute; give up well after that
+const JOB_TIMEOUT_MS = 5 * 60 * 1000
+const JOB_POLL_INTERVAL_MS = 1000
+
+export async function waitForJob(jobId: string, accessToken: string, timeoutMs: number = JOB_TIMEOUT_MS) {
+  const deadline = Date.now() + timeoutMs
+
+  while (Date.now() < deadline) {
+    const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/v1/jobs/${jobId}`, {
+      headers: { 'Authorization': `Bearer ${accessToken}` },
+      credentials: 'include'
+    })
+    if (!response.ok) {
+      throw new Error('Lost track of repository creation. Please check your dashboard.')
+    }
+
+    const job: Job = await response.json()
+    if (job.status === 'succeeded') {
+      return job.result
+    }
+    if (job.status === 'failed') {
+      if (job.error?.status_code === 422) {
+        throw new Error(job.error.detail || 'A repository with this name already exists. Please choose a different name.')
+      } else if (job.error?.status_code === 403) {
+        throw new Error('Insufficient permissions. Please make sure you have granted repository creation permissions.')
+      }
+      throw new Error(job.error?.detail || 'Failed to create repository')
+    }
+
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+  }
+
+  throw new Error('Repository creation is taking longer than expected. Please check your dashboard.')
+}